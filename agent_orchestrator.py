@@ -1,20 +1,16 @@
 import os
 import json,re
-import subprocess
 import argparse
-from langchain.agents import Tool, initialize_agent, AgentType
-from langchain.chains import RetrievalQA
-from langchain_core.prompts import PromptTemplate
-from langchain_openai import ChatOpenAI
-from services.fastapi_service.recommendation_api import get_recommendations
-from langchain_ollama import ChatOllama,OllamaEmbeddings
-from langchain_chroma import Chroma
-from langchain.chains import RetrievalQA
-
-# Load API key
+from functools import lru_cache
+from services.pipeline_service.pipeline_runner import run_ingestion
+from services.rag_service.rag_service import get_rag_service
+from utils.applicants import normalize_key, normalize_keys, in_scope
+from utils.log import get_logger
+
+log = get_logger("agent")
+
+# Only the (unused) LangChain agent executor needs this; see get_agent_executor()
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY","")
-if not OPENAI_API_KEY:
-    raise ValueError("Missing OPENAI_API_KEY environment variable")
 
 current_applicant = None
 
@@ -29,35 +25,41 @@ def extract_json_block(text):
     return None
 
 
-def etl_agent(_: str) -> dict:
+def etl_agent(applicant_key: str) -> dict:
+    """
+    Micro-agent: run ETL → DB ingest → feature engineering / Chroma ingest
+    in-process for this applicant only. Returns the processed files plus a
+    per-stage status/duration report.
+    """
+    keys = normalize_keys(applicant_key or None)
     try:
-        # 1. Extraction
-        subprocess.run(["python", "services/ingestion_service/etl_pipeline.py"], check=True)
-        # 2. Feature engineering
-        subprocess.run(["python", "services/preprocessing_service/feature_engineering.py"], check=True)
-        # 3. DB ingest
-        subprocess.run(["python", "services/ingestion_service/db_ingest.py"], check=True)
-        # 4. Chroma ingest
-        subprocess.run(["python", "services/ingestion_service/chroma_ingest.py"], check=True)
-
-        # Check manifest
-        manifest_path = "data/processed/manifest.json"
-        if not os.path.exists(manifest_path):
-            return {"error": "No manifest.json generated; no files processed."}
-        with open(manifest_path, "r") as f:
-            content = f.read()
-            if not content.strip():
-                return {"error": "Empty manifest.json; no files processed."}
+        result = run_ingestion(keys)
     except Exception as e:
         return {"error": f"ETL failed: {e}"}
 
+    stages = [r.to_dict() for r in result["stages"]]
+    etl = result["stages"][0]
+    manifest = etl.output if etl.status == "ok" else None
+    if not result["ok"]:
+        failed = next(r for r in result["stages"] if r.status == "failed")
+        return {"error": f"ETL failed at {failed.name}: {failed.error}", "stages": stages}
+    if not manifest:
+        return {"error": "Empty manifest.json; no files processed.", "stages": stages}
+    return {
+        "processed_files": sorted({e["source"] for e in manifest if in_scope(e["source"], keys)}),
+        "stages": stages,
+        "duration_s": result["duration_s"],
+    }
+
 
 def model_agent(applicant_key: str) -> dict:
     """
     Micro-agent: call recommendation API for eligibility.
     """
-    eligibility_check= get_recommendations(applicant_key)
-    print("Shruti: In model_agent(), Eligibility check result:", eligibility_check)
+    from services.fastapi_service.recommendation_api import get_recommendations
+
+    eligibility_check= get_recommendations(normalize_key(applicant_key))
+    log.debug("model_agent applicant_key=%s result=%s", applicant_key, eligibility_check)
     return eligibility_check
 
 
@@ -65,55 +67,14 @@ def rag_agent(question: str, applicant_key: str) -> dict:
     """
     Micro-agent: perform RAG retrieval for given question using Ollama/mistral.
     """
-    # Use Ollama for both embeddings and LLM (if Ollama server is running and mistral is pulled)
-    emb = OllamaEmbeddings(model="mistral")  
-    vectordb = Chroma(
-        persist_directory="chromadb_data",
-        embedding_function=emb,
-        collection_name="support_documents"
-    )
-    # Filter by applicant_key if supported in your pipeline (add filter logic if needed)
-    retriever = vectordb.as_retriever(search_kwargs={"k": 4},
-                                      filters={"applicant_key": {"$eq": applicant_key}}
-                                      )
-
-    llm = ChatOllama(model="mistral")  # Adjust to your local model's name if needed
-
-    qa = RetrievalQA.from_chain_type(
-        llm=llm,
-        chain_type="stuff",
-        retriever=retriever
-    )
-    out = qa.invoke({"query": question})
-    print("Shruti: In rag_agent(), RAG answer:", out)
+    # Vector store, Ollama clients and QA chain are opened once per process
+    answer, docs = get_rag_service().answer(question, applicant_key)
+    log.debug("rag_agent applicant_key=%s docs=%d answer=%s", applicant_key, len(docs), answer)
     # Make sure to return as dict for agent chaining
-    if isinstance(out, dict) and "result" in out:
-        return {"rag_answer": out.get("result",out)}
-    else:
-        return {"rag_answer": str(out)}
-    
-# Define tools
-tools = [
-    Tool(
-        name="ETL",
-        func=lambda arg: json.dumps(etl_agent(arg)),
-        description="Run the ETL pipeline; ignore input value."
-    ),
-    Tool(
-        name="EligibilityModel",
-        func=lambda key: json.dumps(model_agent(key)),
-        description="Get program recommendations for applicant_key."
-    ),
-    Tool(
-        name="RAGRetrieval",
-        func=lambda q: rag_agent(q, current_applicant),
-        description="Answer questions about the applicant's documents."
-    )
-]
+    return {"rag_answer": answer}
+
 
-prompt = PromptTemplate(
-    input_variables=["input"],
-    template="""
+PROMPT_TEMPLATE = """
 You are a master orchestrator AI agent. You will receive a JSON string as input, with applicant_key and question fields.
 
 
@@ -139,17 +100,49 @@ Example output:
 
 Input: {input}
 """
-)
-
-# Initialize agent
-agent_executor = initialize_agent(
-    tools,
-    ChatOpenAI(temperature=0.2, openai_api_key=OPENAI_API_KEY),
-    agent=AgentType.STRUCTURED_CHAT_ZERO_SHOT_REACT_DESCRIPTION,
-    verbose=True,
-    prompt=prompt,
-    handle_parsing_errors=True
-)
+
+
+@lru_cache(maxsize=None)
+def get_agent_executor():
+    """
+    LangChain tool-calling agent over the three micro-agents. run_master calls
+    the agents directly, so this is only built (and OPENAI_API_KEY only
+    required) when something asks for it.
+    """
+    from langchain.agents import Tool, initialize_agent, AgentType
+    from langchain_core.prompts import PromptTemplate
+    from langchain_openai import ChatOpenAI
+
+    if not OPENAI_API_KEY:
+        raise ValueError("Missing OPENAI_API_KEY environment variable")
+    tools = [
+        Tool(
+            name="ETL",
+            func=lambda arg: json.dumps(etl_agent(arg)),
+            description="Run the ETL pipeline; ignore input value."
+        ),
+        Tool(
+            name="EligibilityModel",
+            func=lambda key: json.dumps(model_agent(key)),
+            description="Get program recommendations for applicant_key."
+        ),
+        Tool(
+            name="RAGRetrieval",
+            func=lambda q: rag_agent(q, current_applicant),
+            description="Answer questions about the applicant's documents."
+        )
+    ]
+
+    prompt = PromptTemplate(input_variables=["input"], template=PROMPT_TEMPLATE)
+    return initialize_agent(
+        tools,
+        ChatOpenAI(temperature=0.2, openai_api_key=OPENAI_API_KEY),
+        agent=AgentType.STRUCTURED_CHAT_ZERO_SHOT_REACT_DESCRIPTION,
+        verbose=True,
+        prompt=prompt,
+        handle_parsing_errors=True
+    )
+
 
 # Master orchestrator: always run ETL, model, then RAG if question provided
 def run_master(applicant_key: str, question: str = None) -> dict:
@@ -166,7 +159,7 @@ def run_master(applicant_key: str, question: str = None) -> dict:
         if question:
             rag_answer = rag_agent(question, applicant_key).get("rag_answer")
         return {"manifest": manifest, "recommendations": recommendations, "rag_answer": rag_answer}
-        # output = agent_executor.run({"input": json.dumps(input_text)})
+        # output = get_agent_executor().run({"input": json.dumps(input_text)})
         # # Ensure JSON-only output
         # json_text = extract_json_block(output)
         # if not json_text:
@@ -3,6 +3,11 @@ import pandas as pd
 import streamlit as st
 from datetime import datetime
 from agent_orchestrator import run_master, rag_agent
+from utils.log import get_logger
+from utils.metrics import serve_metrics
+
+log = get_logger("app")
+serve_metrics()              # rag_retrieval / llm_generation / scoring stages run in this process
 
 os.makedirs("data/raw", exist_ok=True)
 os.makedirs("logs", exist_ok=True)
@@ -67,7 +72,7 @@ if submitted:
 
     try:
         result = run_master(applicant_key, question=None)
-        print("Shruti",result)
+        log.debug("run_master applicant_key=%s result=%s", applicant_key, result)
         st.session_state["result"] = result
         st.session_state["manifest"] = result.get("manifest", {})
         st.session_state["processing"] = False
@@ -95,9 +100,8 @@ if st.session_state["processing"]:
 if st.session_state.get("result"):
     st.subheader("Eligibility")
     recs = st.session_state["result"].get("recommendations", { "eligible": False, "recommendations": {"Upskilling Grant": 0.0, "Stipend":0.0,"Career Counseling":0.0}})
-    print("Shruti: In app.py Recommendations:", recs)
     eligible = recs.get("eligible", False)
-    print("Shruti: In app.py eligible:", eligible)
+    log.debug("recommendations applicant_key=%s eligible=%s recs=%s", applicant_key, eligible, recs)
     if not recs:
         st.info("Not eligible for any programs at this time.")
     else:
@@ -128,10 +132,10 @@ if applicant_key:
     if st.button("Send", key="doc_chat_send"):
         try:
             # Direct RAG call instead of agent, for full control
-            print("Shruti: In app.py, calling rag_agent with question:", chat_q, ' and applicant_key:', applicant_key)
+            log.debug("rag_agent call applicant_key=%s question=%r", applicant_key, chat_q)
             rag_res = rag_agent(chat_q, applicant_key)
             rag_answer = rag_res.get("rag_answer", "No answer.")
-            print("Shruti: In app.py, RAG answer:", rag_answer)
+            log.debug("rag_agent answer applicant_key=%s answer=%r", applicant_key, rag_answer)
             st.session_state["messages"].append(("user", chat_q))
             st.session_state["messages"].append(("agent", rag_answer))
             # Log for auditability
@@ -0,0 +1,76 @@
+"""
+Parity and latency of the compiled forest against models/recs_model.pkl.
+
+    python -m benchmarks.bench_compiled_forest [--rows 2000] [--calls 500] [--tol 1e-9]
+
+Rows come from the training dataset's test split when it exists, otherwise
+from a standard normal. Exits non-zero if probabilities or predictions differ.
+"""
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import joblib
+
+from services.training_service.compiled_forest import CompiledForest, MODEL_PATH
+from services.training_service.dataset import TrainingDataset, DATASET_DIR
+
+
+def sklearn_proba(model, X):
+    """(n_rows, n_targets) P(class 1) the way /recommend reads it."""
+    out = np.zeros((len(X), len(model.estimators_)))
+    for i, (probs, est) in enumerate(zip(model.predict_proba(X), model.estimators_)):
+        classes = list(est.classes_)
+        if 1 in classes:
+            out[:, i] = probs[:, classes.index(1)]
+    return out
+
+
+def sample_rows(n, n_features, seed=42):
+    if os.path.exists(os.path.join(DATASET_DIR, "meta.json")):
+        ds = TrainingDataset(DATASET_DIR)
+        return ds.take(ds.rows("test")[:n])[0]
+    return np.random.default_rng(seed).standard_normal((n, n_features)).astype(np.float32)
+
+
+def latency_ms(fn, X, calls):
+    times = []
+    for i in range(calls):
+        row = X[i % len(X)][None, :]
+        start = time.perf_counter()
+        fn(row)
+        times.append((time.perf_counter() - start) * 1000)
+    return np.percentile(times, 50), np.percentile(times, 99)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--tol", type=float, default=1e-9)
+    args = parser.parse_args()
+
+    model = joblib.load(args.model)
+    compiled = CompiledForest.from_sklearn(model)
+    X = sample_rows(args.rows, compiled.n_features)
+
+    expected, got = sklearn_proba(model, X), compiled.predict_proba(X)
+    max_diff = float(np.abs(expected - got).max())
+    pred_mismatch = int((model.predict(X) != compiled.predict(X)).sum())
+
+    s50, s99 = latency_ms(model.predict_proba, X, args.calls)
+    c50, c99 = latency_ms(compiled.predict_proba, X, args.calls)
+    start = time.perf_counter()
+    compiled.predict_proba(X)
+    batch_s = time.perf_counter() - start
+    print(f"trees: {int(compiled.tree_counts.sum())}  nodes: {len(compiled.feature)}  max depth: {compiled.max_depth}")
+    print(f"sklearn  single row: p50 {s50:7.3f} ms  p99 {s99:7.3f} ms")
+    print(f"compiled single row: p50 {c50:7.3f} ms  p99 {c99:7.3f} ms  ({s50 / max(c50, 1e-9):.1f}x faster)")
+    print(f"compiled batch of {len(X)}: {batch_s * 1000:.1f} ms")
+
+    if max_diff > args.tol or pred_mismatch:
+        print(f"✘ Parity check failed: max |Δp| = {max_diff:.3g}, {pred_mismatch} prediction mismatches")
+        sys.exit(1)
+    print(f"✅ Parity check passed: max |Δp| = {max_diff:.3g} over {len(X)} rows")
@@ -0,0 +1,173 @@
+"""
+Parity check + benchmark for the set-based feature engine.
+
+Runs the original per-applicant loop (kept here as the reference
+implementation) and feature_engineering.compute_features against the same
+database, asserts the outputs match, and reports the speedup.
+
+When an applicant has several credit reports or resumes, the original loop
+took whichever row Postgres happened to return first. Both implementations
+now take the row with the lowest doc_id (then physical row order), so the
+parity check compares a defined value instead of matching by chance.
+
+    python -m benchmarks.bench_feature_engineering [--applicant KEY ...] [--repeat 3]
+
+Exits non-zero if any applicant's features differ.
+"""
+import sys
+import time
+import argparse
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+from datetime import date
+from dateutil.relativedelta import relativedelta
+
+from services.preprocessing_service.feature_engineering import compute_features, FEATURE_COLUMNS
+from utils.applicants import normalize_keys
+from utils.resources import get_engine
+
+
+def compute_age(dob):
+    return relativedelta(date.today(), dob).years
+
+
+def legacy_features(engine, applicant_keys=None):
+    """The pre-set-based implementation: ~6 round trips per applicant."""
+    df_apps = pd.read_sql("SELECT DISTINCT applicant_key FROM raw_documents", engine)
+    if applicant_keys is not None:
+        df_apps = df_apps[df_apps["applicant_key"].isin(applicant_keys)]
+
+    records = []
+    for app in df_apps["applicant_key"]:
+        # 2) Fetch all doc_ids + sheet_names for this applicant
+        df_docs = pd.read_sql(
+            text("SELECT id, sheet_name FROM raw_documents WHERE applicant_key = :app"),
+            engine,
+            params={"app": app}
+        )
+        if df_docs.empty:
+            continue
+        doc_ids = df_docs["id"].tolist()
+
+        # 3) Income estimate from bank_transactions
+        tx = pd.read_sql(
+            text("SELECT * FROM bank_transactions WHERE doc_id = ANY(:ids)"),
+            engine,
+            params={"ids": doc_ids}
+        )
+        if tx.empty:
+            income = 0
+        else:
+            # sum up all credit transactions (Salary, Dividend, etc.) as monthly income proxy
+            credits = tx[tx["amount"] > 0]["amount"]
+            income = credits.sum() if not credits.empty else 0
+
+        # 4) Net worth using sheet_name to separate assets vs liabilities
+        # Document IDs for "Assets" and "Liabilities" sheets
+        asset_ids = df_docs[df_docs["sheet_name"].str.lower() == "assets"]["id"].tolist()
+        liability_ids = df_docs[df_docs["sheet_name"].str.lower() == "liabilities"]["id"].tolist()
+        # Query values
+        assets_df = pd.read_sql(
+            text("SELECT value FROM assets_liabilities WHERE doc_id = ANY(:ids)"),
+            engine,
+            params={"ids": asset_ids}
+        )
+        liabs_df = pd.read_sql(
+            text("SELECT value FROM assets_liabilities WHERE doc_id = ANY(:ids)"),
+            engine,
+            params={"ids": liability_ids}
+        )
+        assets_val = assets_df["value"].sum() if not assets_df.empty else 0
+        liabs_val = liabs_df["value"].sum() if not liabs_df.empty else 0
+        net_worth = assets_val - liabs_val
+
+        # 5) Credit health from credit_reports
+        cr = pd.read_sql(
+            text("SELECT * FROM credit_reports WHERE doc_id = ANY(:ids) ORDER BY doc_id, ctid"),
+            engine,
+            params={"ids": doc_ids}
+        )
+        credit_score = int(cr["credit_score"].iloc[0]) if not cr.empty else None
+
+        # 6) Demographics & experience from resumes
+        rv = pd.read_sql(
+            text("SELECT dob, total_experience_years FROM resumes WHERE doc_id = ANY(:ids) "
+                 "ORDER BY doc_id, ctid"),
+            engine,
+            params={"ids": doc_ids}
+        )
+        if rv.empty:
+            age = None
+            exp_years = None
+        else:
+            dob_raw = rv["dob"].iloc[0]
+            dob = pd.to_datetime(dob_raw).date() if dob_raw is not None else None
+            age = compute_age(dob) if dob else None
+            exp_years = int(rv["total_experience_years"].iloc[0]) if rv["total_experience_years"].iloc[0] is not None else None
+
+        # 7) Family size (from application_logs, placeholder)
+        family_size = None
+
+        records.append({
+            "applicant_key": app,
+            "income": income,
+            "net_worth": net_worth,
+            "credit_score": credit_score,
+            "age": age,
+            "experience_years": exp_years,
+            "family_size": family_size
+        })
+
+
+    return pd.DataFrame(records, columns=FEATURE_COLUMNS)
+
+
+def _timed(fn, repeat):
+    best, out = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, out
+
+
+def compare(legacy, fast):
+    """List of human-readable mismatches (empty when the frames agree)."""
+    legacy = legacy.set_index("applicant_key").sort_index()
+    fast = fast.set_index("applicant_key").sort_index()
+    problems = []
+    if list(legacy.index) != list(fast.index):
+        problems.append(f"applicant sets differ: {sorted(set(legacy.index) ^ set(fast.index))}")
+        return problems
+    for col in FEATURE_COLUMNS[1:]:
+        a = pd.to_numeric(legacy[col], errors="coerce").astype(float).to_numpy()
+        b = pd.to_numeric(fast[col], errors="coerce").astype(float).to_numpy()
+        bad = ~np.isclose(a, b, rtol=1e-9, atol=1e-6, equal_nan=True)
+        for key in legacy.index[bad]:
+            problems.append(f"{key}.{col}: legacy={legacy.at[key, col]!r} set-based={fast.at[key, col]!r}")
+    return problems
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--applicant", action="append", dest="applicant_keys")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per implementation (best time is kept)")
+    args = parser.parse_args()
+
+    engine = get_engine()
+    keys = normalize_keys(args.applicant_keys)
+    t_legacy, legacy = _timed(lambda: legacy_features(engine, keys), args.repeat)
+    t_fast, fast = _timed(lambda: compute_features(engine, keys), args.repeat)
+
+    print(f"applicants:  {len(fast)}")
+    print(f"legacy loop: {t_legacy * 1000:9.1f} ms")
+    print(f"set-based:   {t_fast * 1000:9.1f} ms  ({t_legacy / max(t_fast, 1e-9):.1f}x faster)")
+
+    problems = compare(legacy, fast)
+    if problems:
+        print(f"✘ Parity check failed ({len(problems)} mismatches):")
+        for p in problems[:50]:
+            print("  ", p)
+        sys.exit(1)
+    print("✅ Parity check passed: outputs identical")
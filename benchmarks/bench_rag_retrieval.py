@@ -0,0 +1,71 @@
+"""
+Applicant-scoped retrieval vs. the old corpus-wide similarity search.
+
+    python -m benchmarks.bench_rag_retrieval [--applicants 50] [--k 4]
+
+For each sampled applicant, one of their own stored chunk embeddings is used
+as the query (no embedding server needed) and searched two ways:
+
+  corpus-wide   collection.query over every chunk (what rag_agent did)
+  scoped        RagService.search: only the applicant's chunks, exact L2
+
+It reports latency of both, how many corpus-wide hits belonged to other
+applicants, and checks the scoped hits against Chroma's own filtered query.
+Exits non-zero if a scoped hit belongs to another applicant or is farther
+than Chroma's filtered result at the same rank.
+"""
+import sys
+import time
+import random
+import argparse
+import statistics
+
+from utils.resources import get_chroma_collection
+from services.rag_service.rag_service import RagService
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--applicants", type=int, default=50)
+    parser.add_argument("--k", type=int, default=4)
+    args = parser.parse_args()
+
+    collection = get_chroma_collection()
+    keys = sorted({m["applicant_key"] for m in collection.get(include=["metadatas"])["metadatas"]
+                   if m.get("applicant_key")})
+    if not keys:
+        sys.exit("No chunks in the collection; run chroma_ingest first")
+    keys = random.Random(42).sample(keys, min(args.applicants, len(keys)))
+    service = RagService(top_k=args.k)
+
+    t_global, t_scoped, leaked, returned, failures = [], [], 0, 0, []
+    for key in keys:
+        own = collection.get(where={"applicant_key": key}, limit=1, include=["embeddings"])
+        query = own["embeddings"][0]
+
+        start = time.perf_counter()
+        hits = collection.query(query_embeddings=[query], n_results=args.k, include=["metadatas"])
+        t_global.append(time.perf_counter() - start)
+        leaked += sum(m.get("applicant_key") != key for m in hits["metadatas"][0])
+        returned += len(hits["ids"][0])
+
+        start = time.perf_counter()
+        ids, _, metas, dist = service.search(query, key)
+        t_scoped.append(time.perf_counter() - start)
+
+        # Chroma's filtered HNSW search is approximate, so compare distances, not ids:
+        # the exact ranking may never be worse than it (squared L2 on both sides)
+        expected = collection.query(query_embeddings=[query], n_results=args.k,
+                                    where={"applicant_key": key}, include=["distances"])["distances"][0]
+        if (any(m.get("applicant_key") != key for m in metas) or len(ids) != len(expected)
+                or any(d > e * (1 + 1e-4) + 1e-6 for d, e in zip(dist, expected))):
+            failures.append(key)
+
+    ms = lambda ts: f"p50 {statistics.median(ts) * 1000:7.2f} ms  max {max(ts) * 1000:7.2f} ms"
+    print(f"applicants:   {len(keys)}  (collection: {collection.count()} chunks)")
+    print(f"corpus-wide:  {ms(t_global)}  {leaked}/{returned} hits from other applicants")
+    print(f"scoped:       {ms(t_scoped)}")
+    if failures:
+        print(f"✘ scoped retrieval wrong for {len(failures)} applicants, e.g. {failures[:5]}")
+        sys.exit(1)
+    print("✅ Scoped hits belong to the applicant and are at least as close as Chroma's filtered query")
@@ -0,0 +1,61 @@
+"""
+Batch scoring vs. a loop of single /recommend calls, in-process (no HTTP).
+
+    python -m benchmarks.bench_recommend_batch [--keys 2000] [--batch-size 1000]
+
+Uses the first N applicant keys from application_features and the active
+model version. Exits non-zero if the two paths disagree.
+"""
+import sys
+import time
+import argparse
+from sqlalchemy import text
+
+from utils.resources import get_engine
+from utils.prediction_cache import get_prediction_cache
+from services.fastapi_service.recommendation_api import get_recommendations, recommend_many, MAX_BATCH
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--keys", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=MAX_BATCH)
+    args = parser.parse_args()
+
+    cache = get_prediction_cache()
+    with get_engine().connect() as conn:
+        keys = list(conn.execute(text("SELECT applicant_key FROM application_features "
+                                      "ORDER BY applicant_key LIMIT :n"), {"n": args.keys}).scalars())
+    if not keys:
+        sys.exit("No applicants in application_features")
+
+    cache.clear()                               # measure cold scoring, not cache hits
+    start = time.perf_counter()
+    single = [get_recommendations(k) for k in keys]
+    t_single = time.perf_counter() - start
+
+    cache.clear()
+    start = time.perf_counter()
+    batched = []
+    for i in range(0, len(keys), args.batch_size):
+        batched.extend(recommend_many(keys[i:i + args.batch_size])[1])
+    t_batch = time.perf_counter() - start
+
+    start = time.perf_counter()
+    cached = [get_recommendations(k) for k in keys]
+    t_cached = time.perf_counter() - start
+
+    print(f"applicants:    {len(keys)}")
+    print(f"single calls:  {t_single:8.3f} s  ({len(keys) / t_single:9.1f} keys/s)")
+    print(f"batches of {args.batch_size}: {t_batch:8.3f} s  ({len(keys) / t_batch:9.1f} keys/s, "
+          f"{t_single / max(t_batch, 1e-9):.1f}x faster)")
+
+    print(f"cached singles: {t_cached:7.3f} s  ({len(keys) / t_cached:9.1f} keys/s)  {cache.stats()}")
+
+    mismatches = [k for k, a, b in zip(keys, single, batched)
+                  if a["eligible"] != b["eligible"] or
+                  any(abs(a["recommendations"][l] - b["recommendations"][l]) > 1e-9 for l in a["recommendations"])]
+    if mismatches:
+        print(f"✘ {len(mismatches)} applicants scored differently, e.g. {mismatches[:5]}")
+        sys.exit(1)
+    print("✅ Batch and single-call results identical")
@@ -0,0 +1,58 @@
+"""
+Concurrent load against a running recommendation API.
+
+    uvicorn services.fastapi_service.recommendation_api:app --workers 4 --port 8000
+    python -m benchmarks.bench_recommend_load [--url http://localhost:8000] [--requests 2000] [--concurrency 1 8 32 128]
+
+For each concurrency level, N GET /recommend/{key} requests are spread over
+that many in-flight clients. The script reports throughput, p50/p99 latency
+and errors, so pool (DB_POOL_MIN/MAX) and executor (SCORING_WORKERS/QUEUE)
+sizes can be tuned.
+"""
+import time
+import asyncio
+import argparse
+import numpy as np
+import httpx
+from sqlalchemy import text
+
+from utils.resources import get_engine
+
+
+async def _worker(client, url, keys, latencies, errors):
+    for key in keys:
+        start = time.perf_counter()
+        try:
+            resp = await client.get(f"{url}/recommend/{key}")
+            resp.raise_for_status()
+        except Exception:
+            errors.append(key)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+
+async def run_level(url, keys, n_requests, concurrency):
+    plan = [keys[i % len(keys)] for i in range(n_requests)]
+    latencies, errors = [], []
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=30) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(_worker(client, url, plan[i::concurrency], latencies, errors)
+                               for i in range(concurrency)))
+        wall = time.perf_counter() - start
+    return n_requests / wall, np.percentile(latencies, 50), np.percentile(latencies, 99), len(errors)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 128])
+    args = parser.parse_args()
+
+    with get_engine().connect() as conn:
+        keys = list(conn.execute(text("SELECT applicant_key FROM application_features LIMIT 1000")).scalars())
+
+    print(f"{'concurrency':>11} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for c in args.concurrency:
+        rps, p50, p99, errs = asyncio.run(run_level(args.url, keys, args.requests, c))
+        print(f"{c:>11} {rps:>9.1f} {p50:>8.2f} {p99:>8.2f} {errs:>7}")
@@ -0,0 +1,3 @@
+DROP TABLE IF EXISTS application_features, recommendations, recommendation_labels,
+                     application_logs, resumes, assets_liabilities,
+                     credit_reports, bank_transactions, raw_documents CASCADE;
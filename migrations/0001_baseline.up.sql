@@ -1,7 +1,5 @@
-DROP TABLE IF EXISTS application_features, recommendations, recommendation_labels,
-                     application_logs, resumes, assets_liabilities,
-                     credit_reports, bank_transactions, raw_documents CASCADE;
-                     
+-- Baseline: the original schema.sql tables, minus its DROP TABLE bootstrap.
+-- Safe to apply to a database that was initialised from schema.sql.
 CREATE TABLE IF NOT EXISTS raw_documents (
   id SERIAL PRIMARY KEY,
   applicant_key  TEXT,
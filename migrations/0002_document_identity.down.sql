@@ -0,0 +1,2 @@
+DROP INDEX IF EXISTS raw_documents_natural_key;
+ALTER TABLE raw_documents DROP COLUMN IF EXISTS content_hash;
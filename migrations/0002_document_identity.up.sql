@@ -0,0 +1,55 @@
+-- Content-hash document identity used by db_ingest's upserts.
+-- Databases filled by the old append-only ingest contain duplicate
+-- (filename, sheet_name) rows, which would block the unique index below.
+-- Keep the newest row per (filename, sheet_name), drop the older copies and
+-- their child rows, and collapse exact duplicate child rows.
+CREATE TEMP TABLE stale_documents ON COMMIT DROP AS
+SELECT id FROM (
+  SELECT id, ROW_NUMBER() OVER (
+           PARTITION BY filename, COALESCE(sheet_name, '') ORDER BY id DESC) AS rn
+    FROM raw_documents
+) d
+ WHERE rn > 1;
+
+DELETE FROM bank_transactions  WHERE doc_id IN (SELECT id FROM stale_documents);
+DELETE FROM credit_reports     WHERE doc_id IN (SELECT id FROM stale_documents);
+DELETE FROM assets_liabilities WHERE doc_id IN (SELECT id FROM stale_documents);
+DELETE FROM resumes            WHERE doc_id IN (SELECT id FROM stale_documents);
+DELETE FROM raw_documents      WHERE id     IN (SELECT id FROM stale_documents);
+
+DELETE FROM bank_transactions WHERE ctid IN (
+  SELECT ctid FROM (
+    SELECT ctid, ROW_NUMBER() OVER (
+             PARTITION BY doc_id, txn_date, description, amount, balance_after ORDER BY ctid) AS rn
+      FROM bank_transactions
+  ) t
+   WHERE rn > 1
+);
+DELETE FROM credit_reports WHERE ctid IN (
+  SELECT ctid FROM (
+    SELECT ctid, ROW_NUMBER() OVER (
+             PARTITION BY doc_id, credit_score, utilization_pct, inquiries_last_12m ORDER BY ctid) AS rn
+      FROM credit_reports
+  ) t
+   WHERE rn > 1
+);
+DELETE FROM assets_liabilities WHERE ctid IN (
+  SELECT ctid FROM (
+    SELECT ctid, ROW_NUMBER() OVER (PARTITION BY doc_id, category, value ORDER BY ctid) AS rn
+      FROM assets_liabilities
+  ) t
+   WHERE rn > 1
+);
+DELETE FROM resumes WHERE ctid IN (
+  SELECT ctid FROM (
+    SELECT ctid, ROW_NUMBER() OVER (
+             PARTITION BY doc_id, dob, nationality, total_experience_years, current_position ORDER BY ctid) AS rn
+      FROM resumes
+  ) t
+   WHERE rn > 1
+);
+
+ALTER TABLE raw_documents ADD COLUMN IF NOT EXISTS content_hash TEXT;
+
+CREATE UNIQUE INDEX IF NOT EXISTS raw_documents_natural_key
+  ON raw_documents (filename, (COALESCE(sheet_name, '')));
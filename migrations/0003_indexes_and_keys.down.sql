@@ -0,0 +1,19 @@
+-- Restore the baseline INTEGER primary key. The original applicant_id values
+-- were never written by the pipeline, so rows are numbered by applicant_key.
+ALTER TABLE recommendation_labels DROP CONSTRAINT IF EXISTS recommendation_labels_pkey;
+ALTER TABLE recommendation_labels ALTER COLUMN applicant_key DROP NOT NULL;
+ALTER TABLE recommendation_labels ADD COLUMN IF NOT EXISTS applicant_id INTEGER;
+UPDATE recommendation_labels r
+   SET applicant_id = n.rn
+  FROM (SELECT ctid, ROW_NUMBER() OVER (ORDER BY applicant_key) AS rn FROM recommendation_labels) n
+ WHERE r.ctid = n.ctid;
+ALTER TABLE recommendation_labels ADD PRIMARY KEY (applicant_id);
+
+ALTER TABLE raw_documents DROP CONSTRAINT IF EXISTS raw_documents_file_type_check;
+ALTER TABLE raw_documents ALTER COLUMN filename DROP NOT NULL;
+
+DROP INDEX IF EXISTS resumes_doc_id_idx;
+DROP INDEX IF EXISTS assets_liabilities_doc_id_idx;
+DROP INDEX IF EXISTS credit_reports_doc_id_idx;
+DROP INDEX IF EXISTS bank_transactions_doc_id_idx;
+DROP INDEX IF EXISTS raw_documents_applicant_key_idx;
@@ -0,0 +1,47 @@
+-- ── Lookup indexes ────────────────────────────────────────────────────────────
+-- feature_engineering / db_ingest filter documents by applicant; filename
+-- lookups (chroma_ingest) are served by the leading column of raw_documents_natural_key.
+CREATE INDEX IF NOT EXISTS raw_documents_applicant_key_idx ON raw_documents (applicant_key);
+CREATE INDEX IF NOT EXISTS bank_transactions_doc_id_idx    ON bank_transactions (doc_id);
+CREATE INDEX IF NOT EXISTS credit_reports_doc_id_idx       ON credit_reports (doc_id);
+CREATE INDEX IF NOT EXISTS assets_liabilities_doc_id_idx   ON assets_liabilities (doc_id);
+CREATE INDEX IF NOT EXISTS resumes_doc_id_idx              ON resumes (doc_id);
+
+-- ── raw_documents constraints ─────────────────────────────────────────────────
+ALTER TABLE raw_documents ALTER COLUMN filename SET NOT NULL;
+ALTER TABLE raw_documents DROP CONSTRAINT IF EXISTS raw_documents_file_type_check;
+ALTER TABLE raw_documents ADD CONSTRAINT raw_documents_file_type_check
+  CHECK (file_type IN ('table', 'text'));
+
+-- ── recommendation_labels: key by applicant_key ──────────────────────────────
+-- generate_recommendation_lables.py writes applicant_key + three booleans and
+-- never an applicant_id, so the old INTEGER primary key could not be satisfied.
+ALTER TABLE recommendation_labels ADD COLUMN IF NOT EXISTS applicant_key TEXT;
+ALTER TABLE recommendation_labels DROP CONSTRAINT IF EXISTS recommendation_labels_pkey;
+ALTER TABLE recommendation_labels DROP COLUMN IF EXISTS applicant_id;
+DELETE FROM recommendation_labels WHERE applicant_key IS NULL;
+DELETE FROM recommendation_labels a USING recommendation_labels b
+ WHERE a.applicant_key = b.applicant_key AND a.ctid < b.ctid;
+ALTER TABLE recommendation_labels ALTER COLUMN applicant_key SET NOT NULL;
+ALTER TABLE recommendation_labels ADD PRIMARY KEY (applicant_key);
+
+-- ── application_features: restore key + declared types ───────────────────────
+-- Earlier feature_engineering runs used to_sql(if_exists="replace"), which
+-- recreated the table with float/bigint columns and no primary key.
+ALTER TABLE application_features
+  ALTER COLUMN income           TYPE NUMERIC USING income::numeric,
+  ALTER COLUMN net_worth        TYPE NUMERIC USING net_worth::numeric,
+  ALTER COLUMN credit_score     TYPE INTEGER USING credit_score::integer,
+  ALTER COLUMN age              TYPE INTEGER USING age::integer,
+  ALTER COLUMN experience_years TYPE INTEGER USING experience_years::integer,
+  ALTER COLUMN family_size      TYPE INTEGER USING family_size::integer;
+DELETE FROM application_features WHERE applicant_key IS NULL;
+DELETE FROM application_features a USING application_features b
+ WHERE a.applicant_key = b.applicant_key AND a.ctid < b.ctid;
+DO $$
+BEGIN
+  IF NOT EXISTS (SELECT 1 FROM pg_constraint
+                  WHERE conrelid = 'application_features'::regclass AND contype = 'p') THEN
+    ALTER TABLE application_features ADD PRIMARY KEY (applicant_key);
+  END IF;
+END $$;
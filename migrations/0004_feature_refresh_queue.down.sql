@@ -0,0 +1,2 @@
+ALTER TABLE application_features DROP COLUMN IF EXISTS updated_at;
+DROP TABLE IF EXISTS feature_refresh_queue;
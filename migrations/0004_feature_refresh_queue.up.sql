@@ -0,0 +1,16 @@
+-- Applicants whose documents changed since their features were last computed.
+-- db_ingest enqueues, feature_engineering drains.
+CREATE TABLE IF NOT EXISTS feature_refresh_queue (
+  applicant_key TEXT PRIMARY KEY,
+  enqueued_at   TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+-- Row version for incremental upserts (and for consumers caching features)
+ALTER TABLE application_features
+  ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP NOT NULL DEFAULT NOW();
+
+-- Existing features predate the queue: mark everyone dirty once so the first
+-- incremental run brings them in line with the current documents
+INSERT INTO feature_refresh_queue (applicant_key)
+SELECT DISTINCT applicant_key FROM raw_documents WHERE applicant_key IS NOT NULL
+ON CONFLICT (applicant_key) DO NOTHING;
@@ -0,0 +1 @@
+ALTER TABLE recommendation_labels DROP COLUMN IF EXISTS rule_version;
@@ -0,0 +1,2 @@
+-- Which rule set (config/recommendation_rules.json "version") produced each label row
+ALTER TABLE recommendation_labels ADD COLUMN IF NOT EXISTS rule_version TEXT;
@@ -1,58 +1,276 @@
 import os
 import json
+import time
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
 import pandas as pd
+import pdfplumber
+import pytesseract
+import docx
+from PIL import Image
+
+from utils.applicants import normalize_keys, in_scope
 
+# ─── Config ───────────────────────────────────────────────────────────────────
 RAW_DIR = 'data/raw'
 PROC_DIR = 'data/processed'
-os.makedirs(PROC_DIR, exist_ok=True)
+MANIFEST_PATH = os.path.join(PROC_DIR, 'manifest.json')
+# Worker processes for extraction; defaults to one per core
+ETL_WORKERS = int(os.getenv("ETL_WORKERS", "0")) or os.cpu_count() or 1
+
+
+# ─── Extractors (one per file type) ───────────────────────────────────────────
+def extract_pdf(path):
+    """Text PDFs → str; scanned/tabular PDFs without a text layer → DataFrame."""
+    with pdfplumber.open(path) as pdf:
+        text_out = "\n".join(page.extract_text() or "" for page in pdf.pages).strip()
+        if text_out:
+            return text_out
+        rows = []
+        for page in pdf.pages:
+            for table in page.extract_tables():
+                rows.extend(table)
+    if not rows:
+        return ""
+    header, body = rows[0], rows[1:]
+    return pd.DataFrame(body, columns=header)
+
+
+def extract_image(path):
+    """Emirates ID scans → OCR text."""
+    with Image.open(path) as img:
+        return pytesseract.image_to_string(img)
+
+
+def extract_docx(path):
+    """Resumes → paragraph text."""
+    return "\n".join(p.text for p in docx.Document(path).paragraphs)
+
+
+def extract_xlsx(path):
+    """Assets/liabilities workbooks → {sheet_name: DataFrame}."""
+    return pd.read_excel(path, sheet_name=None)
+
+
+EXTRACTORS = {
+    ".pdf": extract_pdf,
+    ".png": extract_image,
+    ".jpg": extract_image,
+    ".jpeg": extract_image,
+    ".docx": extract_docx,
+    ".xlsx": extract_xlsx,
+}
+
+
+def discover_files(raw_dir=RAW_DIR):
+    """
+    Walk raw_dir (including per-applicant sub-folders) and return the paths
+    that have a registered extractor. Manifest entries are keyed by file name,
+    so only the first occurrence of a duplicated name is kept.
+    """
+    paths, seen = [], set()
+    for root, dirs, files in os.walk(raw_dir):
+        dirs.sort()
+        for fname in sorted(files):
+            if fname.startswith('.'):
+                continue
+            if os.path.splitext(fname)[1].lower() not in EXTRACTORS:
+                print(f'⚠ Skipping {fname}: no extractor for this file type')
+                continue
+            if fname in seen:
+                print(f'⚠ Skipping {os.path.join(root, fname)}: duplicate file name')
+                continue
+            seen.add(fname)
+            paths.append(os.path.join(root, fname))
+    return paths
+
+
+# ─── Content fingerprints ─────────────────────────────────────────────────────
+def file_digest(path, chunk_size=1 << 20):
+    """SHA-256 of a file's contents, read in 1 MiB blocks."""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            h.update(block)
+    return h.hexdigest()
 
-manifest = []
 
-for fname in os.listdir(RAW_DIR):
-    path = os.path.join(RAW_DIR, fname)
+def source_stat(path):
+    st = os.stat(path)
+    return {'source_size': st.st_size, 'source_mtime': st.st_mtime}
+
+
+def load_manifest(proc_dir=PROC_DIR):
+    """Previous manifest grouped by source file name ({} if none/unreadable)."""
+    try:
+        with open(os.path.join(proc_dir, 'manifest.json'), 'r') as f:
+            entries = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    previous = {}
+    for entry in entries:
+        previous.setdefault(entry['source'], []).append(entry)
+    return previous
+
+
+def reusable_entries(path, prev_entries):
+    """
+    Decide whether a raw file can skip extraction.
+    Returns (entries_to_reuse, source_hash); entries is None when the file
+    must be re-extracted. Size+mtime match short-circuits hashing; otherwise
+    the content hash decides (so a touched-but-identical file is reused).
+    """
+    stat = source_stat(path)
+    ref = prev_entries[0] if prev_entries else {}
+    if not ref.get('source_hash'):
+        return None, None
+    if any(not os.path.exists(e['output']) for e in prev_entries):
+        return None, None
+    if (ref.get('source_size'), ref.get('source_mtime')) == (stat['source_size'], stat['source_mtime']):
+        return prev_entries, ref['source_hash']
+    digest = file_digest(path)
+    if digest == ref['source_hash']:
+        return [dict(e, source_path=path, **stat) for e in prev_entries], digest
+    return None, digest
+
+
+def process_file(path, proc_dir=PROC_DIR, source_hash=None):
+    """
+    Extract a single raw file and write its processed output(s).
+    Runs inside a worker process; never raises so one bad file cannot sink
+    the batch. Returns {"source", "entries", "elapsed", "error"}.
+    """
+    fname = os.path.basename(path)
+    base, ext = os.path.splitext(fname)
+    start = time.perf_counter()
+    entries = []
     try:
-        out = ingest_file(path)
-        base, _ = os.path.splitext(fname)
+        fingerprint = {
+            'source_path': path,
+            'source_hash': source_hash or file_digest(path),
+            **source_stat(path),
+        }
+        out = EXTRACTORS[ext.lower()](path)
 
         # 1) Multi-sheet Excel → one CSV per sheet
         if isinstance(out, dict):
             for sheet_name, df in out.items():
-                out_path = os.path.join(PROC_DIR, f'{base}_{sheet_name}.csv')
+                out_path = os.path.join(proc_dir, f'{base}_{sheet_name}.csv')
                 df.to_csv(out_path, index=False)
-                manifest.append({
+                entries.append({
                     'source': fname,
                     'type': 'table',
                     'sheet': sheet_name,
                     'output': out_path
                 })
-                print(f'✔ Processed {fname} [{sheet_name}] → CSV')
         # 2) Single DataFrame (PDF table) → CSV
         elif isinstance(out, pd.DataFrame):
-            out_path = os.path.join(PROC_DIR, f'{base}.csv')
+            out_path = os.path.join(proc_dir, f'{base}.csv')
             out.to_csv(out_path, index=False)
-            manifest.append({
+            entries.append({
                 'source': fname,
                 'type': 'table',
                 'output': out_path
             })
-            print(f'✔ Processed {fname} → CSV')
         # 3) Text → TXT
         else:
-            out_path = os.path.join(PROC_DIR, f'{base}.txt')
+            out_path = os.path.join(proc_dir, f'{base}.txt')
             with open(out_path, 'w', encoding='utf-8') as f:
                 f.write(out)
-            manifest.append({
+            entries.append({
                 'source': fname,
                 'type': 'text',
                 'output': out_path
             })
-            print(f'✔ Processed {fname} → TXT')
-
+        for entry in entries:
+            entry.update(fingerprint, output_hash=file_digest(entry['output']))
+        error = None
     except Exception as e:
-        print(f'✘ Error on {fname}: {e}')
+        entries, error = [], f'{type(e).__name__}: {e}'
+    return {
+        'source': fname,
+        'entries': entries,
+        'elapsed': time.perf_counter() - start,
+        'error': error,
+    }
+
+
+def run(workers=None, raw_dir=RAW_DIR, proc_dir=PROC_DIR, full=False, applicant_keys=None):
+    """
+    Fan extraction out over a process pool and write manifest.json.
+    Unless full=True, raw files whose content hash matches the previous
+    manifest keep their existing outputs and are not re-extracted.
+    With applicant_keys, only those applicants' files are looked at; every
+    other applicant's manifest entries are carried over untouched.
+    Returns the manifest (list of entries, same shape as before plus
+    source/output fingerprints).
+    """
+    workers = workers or ETL_WORKERS
+    applicant_keys = normalize_keys(applicant_keys)
+    os.makedirs(proc_dir, exist_ok=True)
+    paths = [p for p in discover_files(raw_dir) if in_scope(p, applicant_keys)]
+    previous = load_manifest(proc_dir)
+    carried = [e for src, entries in previous.items()
+               if not in_scope(src, applicant_keys) for e in entries]
+    if full:
+        previous = {}
+    start = time.perf_counter()
+
+    results, todo = {}, []
+    for path in paths:
+        fname = os.path.basename(path)
+        reused, digest = reusable_entries(path, previous.get(fname, []))
+        if reused is not None:
+            results[path] = {'source': fname, 'entries': reused, 'elapsed': 0.0,
+                             'error': None, 'reused': True}
+        else:
+            todo.append((path, digest))
+
+    if workers == 1 or len(todo) <= 1:
+        for path, digest in todo:
+            results[path] = process_file(path, proc_dir, digest)
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(todo))) as pool:
+            futures = {pool.submit(process_file, path, proc_dir, digest): path
+                       for path, digest in todo}
+            for fut in as_completed(futures):
+                results[futures[fut]] = fut.result()
+
+    # Merge in discovery order so the manifest is deterministic
+    manifest, failed = carried, 0
+    for path in paths:
+        res = results[path]
+        if res['error']:
+            failed += 1
+            print(f"✘ Error on {res['source']} ({res['elapsed']:.2f}s): {res['error']}")
+            continue
+        manifest.extend(res['entries'])
+        if res.get('reused'):
+            continue
+        for entry in res['entries']:
+            label = f" [{entry['sheet']}]" if 'sheet' in entry else ''
+            kind = 'CSV' if entry['type'] == 'table' else 'TXT'
+            print(f"✔ Processed {res['source']}{label} → {kind} ({res['elapsed']:.2f}s)")
+
+    with open(os.path.join(proc_dir, 'manifest.json'), 'w') as mf:
+        json.dump(manifest, mf, indent=2)
+
+    print(f'✅ ETL pipeline complete: {len(todo) - failed}/{len(todo)} files extracted, '
+          f'{len(paths) - len(todo)} unchanged reused, '
+          f'in {time.perf_counter() - start:.2f}s with {workers} workers. '
+          f'See {os.path.join(proc_dir, "manifest.json")}')
+    return manifest
 
-# Write manifest
-with open(os.path.join(PROC_DIR, 'manifest.json'), 'w') as mf:
-    json.dump(manifest, mf, indent=2)
 
-print('✅ ETL pipeline complete. See data/processed/manifest.json')
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extract raw uploads into data/processed")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Extraction worker processes (default: $ETL_WORKERS or CPU count)")
+    parser.add_argument("--full", action="store_true",
+                        help="Re-extract every file, ignoring content hashes in the previous manifest")
+    parser.add_argument("--applicant", action="append", dest="applicant_keys",
+                        help="Only process this applicant's files (repeatable)")
+    args = parser.parse_args()
+    run(workers=args.workers, full=args.full, applicant_keys=args.applicant_keys)
@@ -0,0 +1,144 @@
+import time
+import json
+import argparse
+import traceback
+from typing import Callable
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from utils.applicants import normalize_keys
+from utils.resources import get_engine, get_embedder, get_chroma_collection
+
+
+# ─── Stage graph primitives ───────────────────────────────────────────────────
+@dataclass
+class Stage:
+    name: str
+    func: Callable                 # called with the shared resources dict
+    depends_on: tuple = ()
+
+
+@dataclass
+class StageResult:
+    name: str
+    status: str                    # "ok" | "failed" | "skipped"
+    duration_s: float = 0.0
+    error: str = None
+    output: object = field(default=None, repr=False)
+
+    def to_dict(self):
+        return {"name": self.name, "status": self.status,
+                "duration_s": round(self.duration_s, 3), "error": self.error}
+
+
+class PipelineRunner:
+    """
+    Runs stages in-process as a dependency graph. A stage starts as soon as
+    all of its dependencies succeeded, so independent stages run concurrently
+    on a thread pool; a stage whose dependency failed is marked "skipped".
+    """
+
+    def __init__(self, stages, max_workers=4):
+        names = {s.name for s in stages}
+        for s in stages:
+            missing = set(s.depends_on) - names
+            if missing:
+                raise ValueError(f"Stage '{s.name}' depends on unknown stage(s): {sorted(missing)}")
+        self.stages = {s.name: s for s in stages}
+        self.max_workers = max_workers
+
+    def _timed(self, stage, resources):
+        start = time.perf_counter()
+        try:
+            out = stage.func(resources)
+            return StageResult(stage.name, "ok", time.perf_counter() - start, output=out)
+        except Exception as e:
+            traceback.print_exc()
+            return StageResult(stage.name, "failed", time.perf_counter() - start,
+                               error=f"{type(e).__name__}: {e}")
+
+    def run(self, resources):
+        results, running = {}, {}
+        pending = dict(self.stages)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while pending or running:
+                for name, stage in list(pending.items()):
+                    deps = [results.get(d) for d in stage.depends_on]
+                    if any(r is not None and r.status != "ok" for r in deps):
+                        results[name] = StageResult(name, "skipped",
+                                                    error="upstream stage did not succeed")
+                        del pending[name]
+                    elif all(r is not None for r in deps):
+                        running[pool.submit(self._timed, stage, resources)] = name
+                        del pending[name]
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    res = fut.result()
+                    results[res.name] = res
+                    del running[fut]
+        for name in pending:                       # only reachable with a dependency cycle
+            results[name] = StageResult(name, "skipped", error="dependency cycle")
+        ordered = [results[name] for name in self.stages]
+        return {
+            "ok": all(r.status == "ok" for r in ordered),
+            "duration_s": round(time.perf_counter() - start, 3),
+            "stages": ordered,
+        }
+
+
+# ─── Ingestion pipeline ───────────────────────────────────────────────────────
+def build_ingestion_pipeline(applicant_keys=None, full=False):
+    """
+    etl ──► db_ingest ──┬─► feature_engineering
+                        └─► chroma_ingest
+
+    Chroma ingest looks documents up by their raw_documents id, so it waits
+    for db_ingest; feature engineering and Chroma ingest then run side by side.
+    """
+    # Imported here so that building the graph only loads what a run needs
+    from services.ingestion_service import etl_pipeline, db_ingest, chroma_ingest
+    from services.preprocessing_service import feature_engineering
+
+    keys = normalize_keys(applicant_keys)
+    return PipelineRunner([
+        Stage("etl",
+              lambda r: etl_pipeline.run(full=full, applicant_keys=keys)),
+        Stage("db_ingest",
+              lambda r: db_ingest.ingest(applicant_keys=keys, engine=r["engine"]),
+              depends_on=("etl",)),
+        Stage("feature_engineering",
+              lambda r: feature_engineering.run(applicant_keys=keys, engine=r["engine"]),
+              depends_on=("db_ingest",)),
+        Stage("chroma_ingest",
+              lambda r: chroma_ingest.ingest(applicant_keys=keys, engine=r["engine"],
+                                             collection=r["collection"], embedder=r["embedder"]),
+              depends_on=("db_ingest",)),
+    ])
+
+
+def shared_resources():
+    """Warm, process-wide resources handed to every stage."""
+    return {"engine": get_engine(), "collection": get_chroma_collection(), "embedder": get_embedder()}
+
+
+def run_ingestion(applicant_keys=None, full=False):
+    runner = build_ingestion_pipeline(applicant_keys, full=full)
+    result = runner.run(shared_resources())
+    for r in result["stages"]:
+        mark = {"ok": "✔", "failed": "✘", "skipped": "⏭"}[r.status]
+        print(f"{mark} {r.name}: {r.status} in {r.duration_s:.2f}s" + (f" ({r.error})" if r.error else ""))
+    print(f"{'✅' if result['ok'] else '⚠'} Pipeline finished in {result['duration_s']:.2f}s")
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run ETL → DB ingest → features/Chroma in-process")
+    parser.add_argument("--applicant", action="append", dest="applicant_keys",
+                        help="Only process this applicant (repeatable)")
+    parser.add_argument("--full", action="store_true", help="Force full re-extraction in ETL")
+    args = parser.parse_args()
+    res = run_ingestion(args.applicant_keys, full=args.full)
+    print(json.dumps([r.to_dict() for r in res["stages"]], indent=2, default=str))
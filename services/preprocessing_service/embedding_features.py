@@ -0,0 +1,107 @@
+import os
+import numpy as np
+
+from utils.log import get_logger
+
+log = get_logger("embedding_features")
+
+# ─── Config ───────────────────────────────────────────────────────────────────
+EMBED_REDUCER = os.getenv("EMBED_REDUCER", "pca")            # pca | projection | none
+EMBED_COMPONENTS = int(os.getenv("EMBED_COMPONENTS", "32"))
+EMBED_FIT_BATCH_ROWS = int(os.getenv("EMBED_FIT_BATCH_ROWS", "4096"))
+EMB_PREFIX = "emb_"
+
+
+def embedding_columns(dim):
+    return [f"{EMB_PREFIX}{i}" for i in range(dim)]
+
+
+def project_embeddings(X, mean, components):
+    """(X - mean) @ components.T in float32: one small GEMM per request/batch."""
+    X = np.asarray(X, dtype=np.float32)
+    return (X - mean) @ components.T
+
+
+def _fit_pca(batches, n_components):
+    from sklearn.decomposition import IncrementalPCA
+
+    # Every partial_fit call needs at least n_components rows, so a block is
+    # fitted only once the next one is ready; a short tail joins the last block
+    ipca, pending, held = IncrementalPCA(n_components=n_components), [], None
+    for X in batches:
+        pending.append(X)
+        if sum(len(b) for b in pending) >= n_components:
+            if held is not None:
+                ipca.partial_fit(held)
+            held, pending = np.concatenate(pending), []
+    tail = [held] if held is not None else []
+    block = np.concatenate(tail + pending) if tail or pending else None
+    if block is None or len(block) < n_components:
+        return None
+    ipca.partial_fit(block)
+    return ipca.mean_.astype(np.float32), ipca.components_.astype(np.float32)
+
+
+def _fit_projection(n_components, dim, random_state=42):
+    from sklearn.random_projection import GaussianRandomProjection
+
+    grp = GaussianRandomProjection(n_components=n_components, random_state=random_state)
+    grp.fit(np.zeros((1, dim), dtype=np.float32))
+    return np.zeros(dim, dtype=np.float32), np.asarray(grp.components_, dtype=np.float32)
+
+
+def fit_embedding_branch(store, method=EMBED_REDUCER, n_components=EMBED_COMPONENTS,
+                         batch_rows=EMBED_FIT_BATCH_ROWS):
+    """
+    Fit the reducer for the centroid embeddings and return a ColumnTransformer
+    branch ("emb", transformer, columns), or None if disabled or there is
+    nothing to fit. PCA is fitted incrementally over centroid batches, so
+    memory is one batch regardless of the number of applicants.
+    """
+    if method == "none":
+        return None
+    if store.dim is None or not len(store):
+        log.warning("embedding branch disabled reason=no_centroids method=%s", method)
+        return None
+    dim, requested = store.dim, n_components
+    n_components = min(n_components, dim)
+    if method == "pca":
+        n_components = min(n_components, len(store))      # PCA can't have more components than rows
+        # A single centroid has no variance to find directions in
+        fitted = _fit_pca((X for _, X in store.batches(batch_rows)), n_components) if len(store) > 1 else None
+    elif method == "projection":
+        fitted = _fit_projection(n_components, dim)
+    else:
+        raise ValueError(f"Unknown embedding reducer '{method}' (expected pca, projection or none)")
+    if fitted is None:
+        log.warning("embedding branch disabled reason=fit_failed method=%s n_components=%d applicants=%d",
+                    method, n_components, len(store))
+        return None
+    if n_components < requested:
+        log.warning("embedding components reduced requested=%d used=%d dim=%d applicants=%d",
+                    requested, n_components, dim, len(store))
+    from sklearn.preprocessing import FunctionTransformer
+
+    mean, components = fitted
+    # The fitted matrices ride along as kw_args so they survive ColumnTransformer's clone()
+    transformer = FunctionTransformer(project_embeddings,
+                                      kw_args={"mean": mean, "components": components})
+    return ("emb", transformer, embedding_columns(dim))
+
+
+def expected_embedding_columns(preprocessor):
+    """emb_* input columns a fitted preprocessor expects (empty if it has no embedding branch)."""
+    names = getattr(preprocessor, "feature_names_in_", None)
+    if names is None:
+        return []
+    return [c for c in names if c.startswith(EMB_PREFIX)]
+
+
+def with_embeddings(df, applicant_keys, store, columns):
+    """Append the centroid columns the preprocessor expects to a feature frame."""
+    import pandas as pd
+
+    if not columns:
+        return df
+    emb = store.matrix(list(applicant_keys), dim=len(columns))
+    return pd.concat([df, pd.DataFrame(emb, columns=columns, index=df.index)], axis=1)
@@ -0,0 +1,90 @@
+import json
+import operator
+import numpy as np
+
+# ─── Config ───────────────────────────────────────────────────────────────────
+RULES_PATH = "config/recommendation_rules.json"
+
+COMPARISONS = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+
+
+def load_rules(path=RULES_PATH):
+    with open(path, "r") as f:
+        rules = json.load(f)
+    for key in ("version", "labels"):
+        if key not in rules:
+            raise ValueError(f"Rule set {path} is missing '{key}'")
+    return rules
+
+
+def _compile(node, where):
+    """
+    Turn one rule node into fn(columns) -> bool ndarray. A node is either a
+    comparison {"feature", "op", "value"} / {"feature", "in": [...]} or a
+    boolean combination {"all": [...]}, {"any": [...]}, {"not": node}.
+    """
+    if "all" in node or "any" in node:
+        combine = np.logical_and if "all" in node else np.logical_or
+        children = [_compile(child, where) for child in node.get("all", node.get("any"))]
+        if not children:
+            raise ValueError(f"{where}: empty combination")
+        return lambda cols: combine.reduce([child(cols) for child in children])
+    if "not" in node:
+        child = _compile(node["not"], where)
+        return lambda cols: ~child(cols)
+    feature = node.get("feature")
+    if feature is None:
+        raise ValueError(f"{where}: rule needs 'feature' or a combination, got {node}")
+    if "in" in node:
+        allowed = np.asarray(node["in"])
+        return lambda cols: np.isin(cols[feature], allowed)
+    if node.get("op") not in COMPARISONS:
+        raise ValueError(f"{where}: unsupported op {node.get('op')!r}")
+    compare, value = COMPARISONS[node["op"]], node["value"]
+    return lambda cols: compare(cols[feature], value)
+
+
+def _features(node):
+    if "all" in node or "any" in node:
+        return set().union(*(_features(c) for c in node.get("all", node.get("any"))))
+    if "not" in node:
+        return _features(node["not"])
+    return {node["feature"]}
+
+
+def compile_rules(rules):
+    """
+    Compile a rule set into fn(DataFrame) -> DataFrame of boolean label
+    columns, evaluated as whole-column NumPy masks (no per-row Python).
+    """
+    labels = {name: _compile(node, name) for name, node in rules["labels"].items()}
+    needed = sorted(set().union(*(_features(n) for n in rules["labels"].values())))
+    fill_na = rules.get("fill_na", {})
+
+    def evaluate(df):
+        missing = [c for c in needed if c not in df.columns]
+        if missing:
+            raise KeyError(f"Rule set {rules['version']} needs missing feature(s): {missing}")
+        cols = {}
+        for c in needed:
+            series = df[c].fillna(fill_na[c]) if c in fill_na else df[c]
+            try:
+                # Nullable Int64/Float64 columns: <NA> → NaN, which compares False
+                cols[c] = series.to_numpy(dtype=float, na_value=np.nan)
+            except (TypeError, ValueError):          # categorical features used with "in"
+                cols[c] = series.to_numpy()
+        out = df[[]].copy()
+        for name, fn in labels.items():
+            out[name] = np.asarray(fn(cols), dtype=bool)
+        return out
+
+    evaluate.version = rules["version"]
+    evaluate.features = needed
+    return evaluate
@@ -0,0 +1,95 @@
+import os
+import threading
+import numpy as np
+
+from utils.metrics import timed
+from utils.applicants import normalize_key
+from utils.resources import OLLAMA_MODEL, get_chroma_collection, get_embedder, get_llm
+from utils.log import get_logger
+
+log = get_logger("rag_service")
+
+# ─── Config ───────────────────────────────────────────────────────────────────
+RAG_TOP_K = int(os.getenv("RAG_TOP_K", "4"))
+
+
+class RagService:
+    """
+    Long-lived question answering over the applicant documents in Chroma.
+
+    The persistent collection, the Ollama embedding/chat clients (each holding
+    one keep-alive HTTP connection pool) and the "stuff" QA chain are built
+    once, under a lock, on the first question. All of them are stateless per
+    call, so concurrent Streamlit sessions share one instance and a question
+    costs only the query embedding, the vector search and the generation.
+
+    Retrieval is scoped to one applicant before any ranking: the collection's
+    metadata index yields only that applicant's chunks (chroma_ingest tags
+    every chunk with `applicant_key`), which are ranked exactly by L2
+    distance, the collection's metric. Cost grows with the applicant's chunk
+    count, not the corpus, and other applicants' documents never reach the
+    prompt.
+    """
+
+    def __init__(self, top_k=RAG_TOP_K):
+        self.top_k = top_k
+        self.collection = self.embedder = self.chain = None
+        self._lock = threading.Lock()
+
+    def _open(self):
+        if self.chain is not None:
+            return
+        with self._lock:
+            if self.chain is not None:
+                return
+            from langchain.chains.question_answering import load_qa_chain
+
+            self.collection, self.embedder = get_chroma_collection(), get_embedder()
+            # Same combine step RetrievalQA.from_chain_type(chain_type="stuff") builds
+            self.chain = load_qa_chain(get_llm(), chain_type="stuff")
+            log.info("rag_service opened model=%s top_k=%d", OLLAMA_MODEL, self.top_k)
+
+    def search(self, query_embedding, applicant_key):
+        """(ids, documents, metadatas, distances) of the applicant's top_k chunks, nearest first."""
+        self._open()
+        # Chunks carry the lower-cased key chroma_ingest derived; users type "Ahmad"
+        chunks = self.collection.get(where={"applicant_key": normalize_key(applicant_key) or ""},
+                                     include=["embeddings", "documents", "metadatas"])
+        if not chunks["ids"]:
+            return [], [], [], np.empty(0)
+        query = np.asarray(query_embedding, dtype=np.float32)
+        dist = ((np.asarray(chunks["embeddings"], dtype=np.float32) - query) ** 2).sum(axis=1)
+        k = min(self.top_k, len(dist))
+        top = np.argpartition(dist, k - 1)[:k]
+        top = top[np.argsort(dist[top], kind="stable")]
+        return ([chunks["ids"][i] for i in top], [chunks["documents"][i] for i in top],
+                [chunks["metadatas"][i] for i in top], dist[top])
+
+    def retrieve(self, question, applicant_key):
+        """The applicant's top_k chunks closest to the question, as LangChain documents."""
+        from langchain_core.documents import Document
+
+        if not normalize_key(applicant_key):
+            return []
+        self._open()
+        with timed("rag_retrieval", OLLAMA_MODEL):
+            _, docs, metas, _ = self.search(self.embedder.embed_query(question), applicant_key)
+        return [Document(page_content=d, metadata=m) for d, m in zip(docs, metas)]
+
+    def answer(self, question, applicant_key):
+        """(answer text, retrieved documents)."""
+        docs = self.retrieve(question, applicant_key)
+        with timed("llm_generation", OLLAMA_MODEL):
+            out = self.chain.invoke({"input_documents": docs, "question": question})
+        text = out.get("output_text", out) if isinstance(out, dict) else out
+        return str(text), docs
+
+
+# Constructing it opens nothing, so the process-wide instance can live at module
+# level (no race between sessions creating their own)
+_service = RagService()
+
+
+def get_rag_service():
+    """Process-wide RagService shared by every agent call and Streamlit session."""
+    return _service
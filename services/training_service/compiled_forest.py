@@ -0,0 +1,157 @@
+import argparse
+import numpy as np
+
+# ─── Config ───────────────────────────────────────────────────────────────────
+MODEL_PATH = "models/recs_model.pkl"
+COMPILED_PATH = "models/recs_model.compiled.npz"
+SMALL_BATCH_PAIRS = 8192          # rows × trees below which leaves() steps all pairs each level
+
+
+class CompiledForest:
+    """
+    A MultiOutputClassifier of random forests flattened into contiguous node
+    arrays. Every tree of every target lives in the same arrays:
+
+      feature, threshold, left, right   per node (leaves point to themselves)
+      leaf_prob, leaf_prob0             P(class 1), P(class 0) at the node (leaves only matter)
+      roots                             first node of each tree
+      tree_counts                       trees per target, in target order
+
+    predict_proba walks all trees for all rows at once, one gather/compare per
+    depth level, and stops at the deepest path actually taken rather than at
+    max_depth; for large batches, (row, tree) pairs that reached a leaf drop
+    out of later levels. A single row still pays one round of NumPy calls per
+    level of its deepest path (~15-20 µs each), so unbounded-depth forests
+    stay around 0.5-1 ms per row; bound max_depth for a sub-millisecond p99
+    (the training search times this class, so --latency-budget-ms filters on
+    it). Per-target leaf values are then summed tree by tree in estimator
+    order, like the forests' own predict_proba, so probabilities match bit
+    for bit and predict() can apply sklearn's argmax tie rule.
+    """
+
+    def __init__(self, feature, threshold, left, right, leaf_prob, roots, tree_counts, max_depth, n_features,
+                 leaf_prob0=None):
+        self.feature, self.threshold = feature, threshold
+        self.left, self.right, self.leaf_prob = left, right, leaf_prob
+        self.leaf_prob0 = 1.0 - leaf_prob if leaf_prob0 is None else leaf_prob0   # older exports
+        self.roots, self.tree_counts = roots, tree_counts
+        self.max_depth, self.n_features = int(max_depth), int(n_features)
+        self._bounds = np.concatenate([[0], np.cumsum(tree_counts)])
+        self._child = np.empty(2 * len(left), dtype=left.dtype)     # [2n] = right, [2n + 1] = left
+        self._child[0::2], self._child[1::2] = right, left
+        self._is_leaf = left == np.arange(len(left))
+
+    @classmethod
+    def from_sklearn(cls, model):
+        parts = {k: [] for k in ("feature", "threshold", "left", "right", "leaf_prob", "leaf_prob0")}
+        roots, tree_counts, offset, max_depth = [], [], 0, 0
+        for est in model.estimators_:                  # one forest per target
+            classes = list(est.classes_)
+            pos = classes.index(1) if 1 in classes else None
+            neg = classes.index(0) if 0 in classes else None
+            for tree in est.estimators_:
+                t = tree.tree_
+                n = t.node_count
+                is_leaf = t.children_left == -1
+                ids = np.arange(n)
+                value = t.value[:, 0, :]
+                total = value.sum(axis=1)
+                total[total == 0.0] = 1.0
+                prob = (value[:, pos] / total) if pos is not None else np.zeros(n)
+                prob0 = (value[:, neg] / total) if neg is not None else np.zeros(n)
+                parts["feature"].append(np.where(is_leaf, 0, t.feature))
+                parts["threshold"].append(t.threshold)
+                parts["left"].append(np.where(is_leaf, ids, t.children_left) + offset)
+                parts["right"].append(np.where(is_leaf, ids, t.children_right) + offset)
+                parts["leaf_prob"].append(prob)
+                parts["leaf_prob0"].append(prob0)
+                roots.append(offset)
+                offset += n
+                max_depth = max(max_depth, t.max_depth)
+            tree_counts.append(len(est.estimators_))
+        return cls(
+            feature=np.concatenate(parts["feature"]).astype(np.int32),
+            threshold=np.concatenate(parts["threshold"]).astype(np.float64),
+            left=np.concatenate(parts["left"]).astype(np.int32),
+            right=np.concatenate(parts["right"]).astype(np.int32),
+            leaf_prob=np.concatenate(parts["leaf_prob"]).astype(np.float64),
+            leaf_prob0=np.concatenate(parts["leaf_prob0"]).astype(np.float64),
+            roots=np.asarray(roots, dtype=np.int32),
+            tree_counts=np.asarray(tree_counts, dtype=np.int32),
+            max_depth=max_depth,
+            n_features=model.estimators_[0].n_features_in_,
+        )
+
+    def save(self, path=COMPILED_PATH):
+        np.savez(path, feature=self.feature, threshold=self.threshold, left=self.left,
+                 right=self.right, leaf_prob=self.leaf_prob, leaf_prob0=self.leaf_prob0, roots=self.roots,
+                 tree_counts=self.tree_counts, max_depth=self.max_depth, n_features=self.n_features)
+
+    @classmethod
+    def load(cls, path=COMPILED_PATH):
+        with np.load(path) as z:
+            return cls(**{k: z[k] for k in z.files})
+
+    def leaves(self, X):
+        """(n_rows, n_trees) leaf node reached in every tree."""
+        # sklearn compares float32 features against float64 thresholds
+        X = np.asarray(X, dtype=np.float32).reshape(-1, self.n_features).astype(np.float64)
+        n_trees = len(self.roots)
+        node = np.tile(self.roots, len(X))                       # row-major (row, tree) pairs
+        offset = np.repeat(np.arange(len(X)) * self.n_features, n_trees)
+        X = X.ravel()
+        if len(node) <= SMALL_BATCH_PAIRS:
+            # Few pairs: per-level numpy overhead dominates, so step every pair
+            # (leaves map to themselves) and only check for completion now and then
+            for level in range(self.max_depth):
+                node = self._child[2 * node + (X[offset + self.feature[node]] <= self.threshold[node])]
+                if level % 4 == 3 and self._is_leaf[node].all():
+                    break
+            return node.reshape(-1, n_trees)
+        # Many pairs: drop the ones that reached a leaf so deep trees don't drag the rest
+        cur, pos = node, np.arange(len(node))
+        while True:
+            nxt = self._child[2 * cur + (X[offset + self.feature[cur]] <= self.threshold[cur])]
+            live = ~self._is_leaf[nxt]
+            if live.all():
+                cur = nxt
+                continue
+            node[pos] = nxt
+            if not live.any():
+                return node.reshape(-1, n_trees)
+            cur, offset, pos = nxt[live], offset[live], pos[live]
+
+    def _mean(self, values):
+        """Per-target mean over trees, accumulated in estimator order like sklearn."""
+        out = np.empty((len(values), len(self.tree_counts)))
+        for i, (start, stop) in enumerate(zip(self._bounds[:-1], self._bounds[1:])):
+            out[:, i] = np.cumsum(values[:, start:stop], axis=1)[:, -1] / (stop - start)
+        return out
+
+    def predict_proba(self, X):
+        """(n_rows, n_targets) P(class 1), matching the forests' predict_proba."""
+        return self._mean(self.leaf_prob[self.leaves(X)])
+
+    def predict(self, X):
+        """sklearn's rule: argmax over (P(0), P(1)), ties going to class 0."""
+        node = self.leaves(X)
+        return (self._mean(self.leaf_prob[node]) > self._mean(self.leaf_prob0[node])).astype(np.int8)
+
+
+def export(model_path=MODEL_PATH, out_path=COMPILED_PATH, model=None):
+    import joblib
+
+    model = model or joblib.load(model_path)
+    compiled = CompiledForest.from_sklearn(model)
+    compiled.save(out_path)
+    print(f"✅ Compiled {int(compiled.tree_counts.sum())} trees / {len(compiled.feature)} nodes "
+          f"(max depth {compiled.max_depth}) to {out_path}")
+    return compiled
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Flatten recs_model.pkl into array-based forest inference")
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--out", default=COMPILED_PATH)
+    args = parser.parse_args()
+    export(args.model, args.out)
@@ -0,0 +1,149 @@
+import os
+import json
+import shutil
+import argparse
+import numpy as np
+
+# ─── Config ───────────────────────────────────────────────────────────────────
+DATASET_DIR = os.getenv("DATASET_DIR", "data/processed/dataset")
+SHARD_ROWS = int(os.getenv("DATASET_SHARD_ROWS", "65536"))
+CHUNK_ROWS = int(os.getenv("DATASET_CHUNK_ROWS", "16384"))
+
+
+class DatasetWriter:
+    """
+    Streams preprocessed rows into a row-sharded on-disk dataset:
+
+      meta.json        {"n_rows", "n_features", "n_labels", "shard_rows", "shards", ...}
+      X-00000.npy      (≤ shard_rows, n_features) float32
+      y-00000.npy      (≤ shard_rows, n_labels)   int8
+      keys.npy         (n_rows,) applicant_key per row
+      test_mask.npy    (n_rows,) bool, True for the held-out split
+
+    Rows are buffered only up to one shard. Everything is written to a sibling
+    "<path>.tmp" directory that replaces `path` on close(), so readers never
+    see a half-written dataset.
+    """
+
+    def __init__(self, path=DATASET_DIR, shard_rows=SHARD_ROWS, feature_names=None, label_names=None):
+        self.path, self.tmp = path, path.rstrip("/") + ".tmp"
+        self.shard_rows = shard_rows
+        self.feature_names, self.label_names = feature_names, label_names
+        shutil.rmtree(self.tmp, ignore_errors=True)
+        os.makedirs(self.tmp)
+        self._X, self._y, self._keys, self._test = [], [], [], []
+        self._buffered, self.n_rows, self.shards = 0, 0, []
+        self.n_features = self.n_labels = None
+
+    def append(self, X, y, keys, test_mask):
+        X = np.asarray(X, dtype=np.float32)
+        y = np.asarray(y, dtype=np.int8).reshape(len(X), -1)
+        if self.n_features is None:
+            self.n_features, self.n_labels = X.shape[1], y.shape[1]
+        elif X.shape[1] != self.n_features:
+            raise ValueError(f"Chunk has {X.shape[1]} features, dataset has {self.n_features}")
+        self._X.append(X)
+        self._y.append(y)
+        self._keys.append(np.asarray(keys, dtype=str))
+        self._test.append(np.asarray(test_mask, dtype=bool))
+        self._buffered += len(X)
+        while self._buffered >= self.shard_rows:
+            self._write_shard(self.shard_rows)
+
+    def _write_shard(self, rows):
+        X, y = np.concatenate(self._X), np.concatenate(self._y)
+        i = len(self.shards)
+        np.save(os.path.join(self.tmp, f"X-{i:05d}.npy"), X[:rows])
+        np.save(os.path.join(self.tmp, f"y-{i:05d}.npy"), y[:rows])
+        self.shards.append(rows)
+        self._X, self._y = ([X[rows:]], [y[rows:]]) if rows < len(X) else ([], [])
+        self._buffered -= rows
+        self.n_rows += rows
+
+    def close(self):
+        if self._buffered:
+            self._write_shard(self._buffered)
+        keys = np.concatenate(self._keys) if self._keys else np.array([], dtype=str)
+        test = np.concatenate(self._test) if self._test else np.array([], dtype=bool)
+        np.save(os.path.join(self.tmp, "keys.npy"), keys)
+        np.save(os.path.join(self.tmp, "test_mask.npy"), test)
+        with open(os.path.join(self.tmp, "meta.json"), "w") as f:
+            json.dump({"n_rows": self.n_rows, "n_features": self.n_features or 0,
+                       "n_labels": self.n_labels or 0, "shard_rows": self.shard_rows,
+                       "shards": self.shards, "feature_names": self.feature_names,
+                       "label_names": self.label_names}, f, indent=2)
+        shutil.rmtree(self.path, ignore_errors=True)
+        os.replace(self.tmp, self.path)
+        return TrainingDataset(self.path)
+
+
+class TrainingDataset:
+    """
+    Read side of a DatasetWriter directory. Shards are opened lazily with
+    mmap_mode="r"; splits are row-index arrays into the one copy on disk, and
+    rows are only materialised by take() or iter_chunks().
+    """
+
+    def __init__(self, path=DATASET_DIR):
+        self.path = path
+        with open(os.path.join(path, "meta.json"), "r") as f:
+            self.meta = json.load(f)
+        self.n_rows, self.n_features = self.meta["n_rows"], self.meta["n_features"]
+        self.n_labels, self.shard_rows = self.meta["n_labels"], self.meta["shard_rows"]
+        self.label_names = self.meta.get("label_names")
+        self._shards = {}
+
+    def __len__(self):
+        return self.n_rows
+
+    def _shard(self, kind, i):
+        if (kind, i) not in self._shards:
+            self._shards[(kind, i)] = np.load(os.path.join(self.path, f"{kind}-{i:05d}.npy"), mmap_mode="r")
+        return self._shards[(kind, i)]
+
+    @property
+    def keys(self):
+        return np.load(os.path.join(self.path, "keys.npy"), mmap_mode="r")
+
+    def rows(self, split=None):
+        """Row indices for split None (all rows), "train" or "test"."""
+        if split is None:
+            return np.arange(self.n_rows)
+        test = np.load(os.path.join(self.path, "test_mask.npy"), mmap_mode="r")
+        if split == "test":
+            return np.flatnonzero(test)
+        if split == "train":
+            return np.flatnonzero(~test)
+        raise ValueError(f"Unknown split '{split}' (expected 'train' or 'test')")
+
+    def take(self, rows):
+        """Gather (X, y) for `rows` into memory, touching one shard at a time."""
+        rows = np.asarray(rows, dtype=np.int64)
+        X = np.empty((len(rows), self.n_features), dtype=np.float32)
+        y = np.empty((len(rows), self.n_labels), dtype=np.int8)
+        shard_ids = rows // self.shard_rows
+        for s in np.unique(shard_ids):
+            pos = np.flatnonzero(shard_ids == s)
+            local = rows[pos] - s * self.shard_rows
+            X[pos] = self._shard("X", s)[local]
+            y[pos] = self._shard("y", s)[local]
+        return X, y
+
+    def iter_chunks(self, rows=None, chunk_rows=CHUNK_ROWS):
+        """Yield (rows, X, y) in blocks of at most `chunk_rows` rows."""
+        rows = self.rows() if rows is None else np.asarray(rows, dtype=np.int64)
+        for start in range(0, len(rows), chunk_rows):
+            block = rows[start:start + chunk_rows]
+            X, y = self.take(block)
+            yield block, X, y
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect the sharded training dataset")
+    parser.add_argument("--path", default=DATASET_DIR)
+    args = parser.parse_args()
+
+    ds = TrainingDataset(args.path)
+    print(f"{len(ds)} rows × {ds.n_features} features, {ds.n_labels} labels "
+          f"in {len(ds.meta['shards'])} shard(s) of ≤{ds.shard_rows} rows")
+    print(f"train={len(ds.rows('train'))} test={len(ds.rows('test'))}")
@@ -0,0 +1,65 @@
+import numpy as np
+
+
+class FastPreprocessor:
+    """
+    The fitted preprocessor (numeric impute + scale, optional embedding
+    projection) reduced to its arrays, so serving builds model rows straight
+    from NumPy without a DataFrame or ColumnTransformer dispatch:
+
+      x = x[:, keep]     (columns the imputer saw only NaN for are dropped, as sklearn does)
+      num = where(isnan(x), medians, x); num = (num - mean) / scale
+      emb = (centroid - emb_mean) @ components.T
+    """
+
+    def __init__(self, numeric_cols, medians, mean, scale, emb_cols=(), emb_mean=None, components=None,
+                 keep=None):
+        self.numeric_cols, self.emb_cols = list(numeric_cols), list(emb_cols)
+        self.keep = np.ones(len(self.numeric_cols), dtype=bool) if keep is None else keep
+        self.medians, self.mean, self.scale = medians, mean, scale
+        self.emb_mean, self.components = emb_mean, components
+
+    def transform(self, X_num, X_emb=None):
+        X = np.asarray(X_num, dtype=np.float64).reshape(-1, len(self.numeric_cols))[:, self.keep]
+        X = np.where(np.isnan(X), self.medians, X)
+        out = (X - self.mean) / self.scale
+        if self.components is not None:
+            emb = (np.asarray(X_emb, dtype=np.float32) - self.emb_mean) @ self.components.T
+            out = np.hstack([out, emb])
+        return out
+
+
+def compile_preprocessor(pipeline):
+    """
+    FastPreprocessor for the pipeline built by prepare_training_data, or None
+    if it has any other shape (callers then keep using pipeline.transform).
+    """
+    from sklearn.pipeline import Pipeline
+    from sklearn.impute import SimpleImputer
+    from sklearn.preprocessing import StandardScaler, FunctionTransformer
+
+    ct = pipeline.steps[-1][1] if isinstance(pipeline, Pipeline) else pipeline
+    branches = {name: (trans, cols) for name, trans, cols in getattr(ct, "transformers_", [])
+                if trans != "drop"}
+    if set(branches) - {"num", "emb"} or "num" not in branches:
+        return None
+    num, numeric_cols = branches["num"]
+    steps = dict(num.steps) if isinstance(num, Pipeline) else {}
+    imputer, scaler = steps.get("simpleimputer"), steps.get("standardscaler")
+    if (not isinstance(imputer, SimpleImputer) or not isinstance(scaler, StandardScaler)
+            or len(steps) != 2 or imputer.add_indicator):
+        return None
+    statistics = imputer.statistics_.astype(np.float64)
+    # An all-NaN training column (e.g. family_size) has a NaN statistic; the
+    # imputer drops it from its output unless keep_empty_features is set
+    keep = ~np.isnan(statistics) | getattr(imputer, "keep_empty_features", False)
+    medians = np.where(np.isnan(statistics), 0.0, statistics)[keep]
+    mean = scaler.mean_ if scaler.mean_ is not None else np.zeros(keep.sum())
+    scale = scaler.scale_ if scaler.scale_ is not None else np.ones(keep.sum())
+    emb_cols, emb_mean, components = (), None, None
+    if "emb" in branches:
+        emb, emb_cols = branches["emb"]
+        if not isinstance(emb, FunctionTransformer) or not emb.kw_args:
+            return None
+        emb_mean, components = emb.kw_args["mean"], emb.kw_args["components"]
+    return FastPreprocessor(numeric_cols, medians, mean, scale, emb_cols, emb_mean, components, keep)
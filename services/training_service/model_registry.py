@@ -0,0 +1,183 @@
+import os
+import json
+import time
+import shutil
+import argparse
+import threading
+from datetime import datetime, timezone
+
+from services.preprocessing_service.embedding_features import expected_embedding_columns
+from services.training_service.compiled_forest import CompiledForest
+from services.training_service.fast_preprocessor import compile_preprocessor
+from utils.log import get_logger
+
+log = get_logger("model_registry")
+
+# ─── Config ───────────────────────────────────────────────────────────────────
+REGISTRY_DIR = os.getenv("MODEL_REGISTRY_DIR", "models/registry")
+REGISTRY_POLL_S = float(os.getenv("MODEL_REGISTRY_POLL_S", "5"))
+PREPROCESSOR_FILE = "preprocessor.pkl"
+MODEL_FILE = "recs_model.pkl"
+COMPILED_FILE = "recs_model.compiled.npz"
+MANIFEST_FILE = "manifest.json"
+LEGACY_PATHS = {"preprocessor": "models/preprocessor.pkl", "model": "models/recs_model.pkl",
+                "compiled": "models/recs_model.compiled.npz"}
+
+# models/registry/
+#   CURRENT                 one line: the active version (replaced atomically)
+#   20261017-181502/        one immutable directory per published version
+#     manifest.json         version, created_at, metrics, feature schema, params
+#     preprocessor.pkl  recs_model.pkl  recs_model.compiled.npz  ...
+
+
+def _current_path(registry_dir):
+    return os.path.join(registry_dir, "CURRENT")
+
+
+def list_versions(registry_dir=REGISTRY_DIR):
+    if not os.path.isdir(registry_dir):
+        return []
+    return sorted(d for d in os.listdir(registry_dir)
+                  if os.path.exists(os.path.join(registry_dir, d, MANIFEST_FILE)))
+
+
+def current_version(registry_dir=REGISTRY_DIR):
+    try:
+        with open(_current_path(registry_dir), "r") as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def activate(version, registry_dir=REGISTRY_DIR):
+    """Point CURRENT at `version` (write-then-rename, so readers never see a partial file)."""
+    if version not in list_versions(registry_dir):
+        raise FileNotFoundError(f"No published model version '{version}' in {registry_dir}")
+    tmp = _current_path(registry_dir) + ".tmp"
+    with open(tmp, "w") as f:
+        f.write(version + "\n")
+    os.replace(tmp, _current_path(registry_dir))
+    print(f"✔ Active model version: {version}")
+
+
+def publish(artifacts, metadata, version=None, registry_dir=REGISTRY_DIR, make_current=True):
+    """
+    Copy `artifacts` ({file name in the version dir: source path}) into a new
+    version directory with a manifest, then optionally switch CURRENT to it.
+    """
+    version = version or datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S")
+    final = os.path.join(registry_dir, version)
+    if os.path.exists(final):
+        raise FileExistsError(f"Model version '{version}' already exists")
+    tmp = final + ".tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    for name, src in artifacts.items():
+        if src and os.path.exists(src):
+            shutil.copy2(src, os.path.join(tmp, name))
+    manifest = {"version": version, "created_at": datetime.now(timezone.utc).isoformat(),
+                "artifacts": sorted(os.listdir(tmp)), **metadata}
+    with open(os.path.join(tmp, MANIFEST_FILE), "w") as f:
+        json.dump(manifest, f, indent=2, default=str)
+    os.replace(tmp, final)
+    print(f"✅ Published model version {version} to {final}")
+    if make_current:
+        activate(version, registry_dir)
+    return version
+
+
+# ─── Loading ──────────────────────────────────────────────────────────────────
+class ModelBundle:
+    """A preprocessor/model pair (plus compiled forest) that always travel together."""
+
+    def __init__(self, version, preprocessor, model, compiled=None, manifest=None):
+        self.version = version
+        self.preprocessor, self.model, self.compiled = preprocessor, model, compiled
+        self.manifest = manifest or {}
+        self.emb_columns = expected_embedding_columns(preprocessor)
+        self.fast = compile_preprocessor(preprocessor)     # None → use preprocessor.transform
+
+
+def load_bundle(version=None, registry_dir=REGISTRY_DIR):
+    """Load `version` (default: CURRENT); without a registry, the legacy models/*.pkl."""
+    import joblib
+
+    version = version or current_version(registry_dir)
+    if version is None:
+        compiled = LEGACY_PATHS["compiled"]
+        return ModelBundle("legacy", joblib.load(LEGACY_PATHS["preprocessor"]),
+                           joblib.load(LEGACY_PATHS["model"]),
+                           CompiledForest.load(compiled) if os.path.exists(compiled) else None)
+    vdir = os.path.join(registry_dir, version)
+    with open(os.path.join(vdir, MANIFEST_FILE), "r") as f:
+        manifest = json.load(f)
+    compiled = os.path.join(vdir, COMPILED_FILE)
+    return ModelBundle(version, joblib.load(os.path.join(vdir, PREPROCESSOR_FILE)),
+                       joblib.load(os.path.join(vdir, MODEL_FILE)),
+                       CompiledForest.load(compiled) if os.path.exists(compiled) else None,
+                       manifest)
+
+
+class ModelWatcher:
+    """
+    Holds the active ModelBundle and swaps it when CURRENT changes. A daemon
+    thread polls the pointer every `poll_s` seconds and loads the new bundle
+    off the request path; requests take one reference via get() and use it
+    for the whole prediction, so a swap never pauses or mixes versions.
+    """
+
+    def __init__(self, registry_dir=REGISTRY_DIR, poll_s=REGISTRY_POLL_S, on_swap=None):
+        self.registry_dir, self.poll_s, self.on_swap = registry_dir, poll_s, on_swap
+        self._bundle = load_bundle(registry_dir=registry_dir)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        if self._thread is None and self.poll_s > 0:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._poll, name="model-watcher", daemon=True)
+                    self._thread.start()
+        return self._bundle
+
+    def check(self):
+        """Load and swap in CURRENT if it moved; returns True on a swap."""
+        version = current_version(self.registry_dir)
+        if version is None or version == self._bundle.version:
+            return False
+        bundle = load_bundle(version, self.registry_dir)
+        self._bundle = bundle                    # single reference assignment: atomic swap
+        if self.on_swap:
+            self.on_swap(bundle)
+        log.info("model_swap version=%s", version)
+        return True
+
+    def _poll(self):
+        while True:
+            time.sleep(self.poll_s)
+            try:
+                self.check()
+            except Exception as e:                # keep serving the current bundle
+                log.warning("model_reload_failed error=%r", e)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="File-based model registry")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="List published versions")
+    act = sub.add_parser("activate", help="Switch CURRENT to a version (deploy or roll back)")
+    act.add_argument("version")
+    show = sub.add_parser("show", help="Print a version's manifest")
+    show.add_argument("version", nargs="?", default=None)
+    args = parser.parse_args()
+
+    if args.command == "list":
+        cur = current_version()
+        for v in list_versions():
+            print(f"{'*' if v == cur else ' '} {v}")
+    elif args.command == "activate":
+        activate(args.version)
+    else:
+        version = args.version or current_version()
+        with open(os.path.join(REGISTRY_DIR, version, MANIFEST_FILE), "r") as f:
+            print(f.read())
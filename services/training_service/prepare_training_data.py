@@ -0,0 +1,107 @@
+import os
+import argparse
+import pandas as pd
+import numpy as np
+from sklearn.impute import SimpleImputer
+from sklearn.preprocessing import StandardScaler
+from sklearn.pipeline import make_pipeline
+from sklearn.compose import ColumnTransformer
+from sqlalchemy import text
+import joblib
+
+from utils.resources import get_engine
+from utils.centroid_store import CentroidStore
+from services.training_service.dataset import DatasetWriter, DATASET_DIR
+from services.preprocessing_service.embedding_features import (
+    fit_embedding_branch, with_embeddings, EMBED_REDUCER, EMBED_COMPONENTS,
+)
+
+
+# ─── Config ────────────────────────────────────────────────────────────────────
+NUMERIC_COLS = ["income", "net_worth", "credit_score", "age", "experience_years", "family_size"]
+LABEL_COLS = ["upskilling_grant", "stipend", "counseling_voucher"]
+TEST_SIZE, RANDOM_STATE = 0.2, 42
+READ_CHUNK_ROWS = int(os.getenv("TRAIN_READ_CHUNK_ROWS", "50000"))
+FIT_SAMPLE_ROWS = int(os.getenv("TRAIN_FIT_SAMPLE_ROWS", "200000"))
+
+# Applicants that have both features and labels, in a stable order
+TRAINING_ROWS_SQL = f"""
+SELECT f.applicant_key, {", ".join(f"f.{c}" for c in NUMERIC_COLS)},
+       {", ".join(f"l.{c}" for c in LABEL_COLS)}
+FROM application_features f
+JOIN recommendation_labels l USING (applicant_key)
+"""
+
+
+def build_preprocessor(emb_branch=None):
+    # Pipeline for numeric features: impute then scale
+    numeric_transformer = make_pipeline(
+        SimpleImputer(strategy="median"),   # fill NaNs with median
+        StandardScaler()                    # then standardize
+    )
+    branches = [("num", numeric_transformer, NUMERIC_COLS)]
+    if emb_branch is not None:
+        branches.append(emb_branch)         # centroid embeddings → low-dim projection
+    preprocessor = ColumnTransformer(
+        branches,
+        remainder="drop"                    # drop any other columns
+    )
+    return make_pipeline(preprocessor)
+
+
+def run(engine=None, dataset_dir=DATASET_DIR, embed_reducer=EMBED_REDUCER, embed_dim=EMBED_COMPONENTS):
+    """
+    Stream features + labels from Postgres in chunks, transform each chunk and
+    append it to the sharded dataset; peak memory is one read chunk plus one
+    shard, independent of the number of applicants.
+    """
+    engine = engine or get_engine()
+    store = CentroidStore()
+    emb_branch = fit_embedding_branch(store, method=embed_reducer, n_components=embed_dim)
+    emb_cols = emb_branch[2] if emb_branch else []
+    if emb_branch:
+        n_out = emb_branch[1].kw_args["components"].shape[0]
+        print(f"Embeddings: {len(store)} applicants, {len(emb_cols)} dims → {n_out} via {embed_reducer}")
+    else:
+        print(f"⚠ No embedding branch (reducer={embed_reducer}, {len(store)} applicants in centroid store)")
+
+    # ─── 1) Fit the preprocessor on a bounded random sample ────────────────────
+    sample = pd.read_sql(text(TRAINING_ROWS_SQL + " ORDER BY random() LIMIT :n"),
+                         engine, params={"n": FIT_SAMPLE_ROWS}).set_index("applicant_key")
+    if sample.empty:
+        raise RuntimeError("No applicants with both features and labels; run feature engineering and labelling first")
+    pipeline = build_preprocessor(emb_branch)
+    pipeline.fit(with_embeddings(sample[NUMERIC_COLS], sample.index, store, emb_cols))
+    print(f"Fitted preprocessor on {len(sample)} sampled applicants")
+    del sample
+
+    # ─── 2) Transform chunk by chunk into the sharded dataset ──────────────────
+    rng = np.random.default_rng(RANDOM_STATE)
+    writer = DatasetWriter(dataset_dir, label_names=LABEL_COLS)
+    with engine.connect() as conn:
+        conn = conn.execution_options(stream_results=True)
+        for chunk in pd.read_sql(text(TRAINING_ROWS_SQL + " ORDER BY f.applicant_key"),
+                                 conn, chunksize=READ_CHUNK_ROWS):
+            chunk = chunk.set_index("applicant_key")
+            dfX = with_embeddings(chunk[NUMERIC_COLS], chunk.index, store, emb_cols)
+            writer.append(pipeline.transform(dfX), chunk[LABEL_COLS].values,
+                          keys=chunk.index.values, test_mask=rng.random(len(chunk)) < TEST_SIZE)
+    dataset = writer.close()
+    print(f"Dataset: {len(dataset)} rows × {dataset.n_features} features in {len(dataset.meta['shards'])} shard(s)")
+    print("Training rows:", len(dataset.rows("train")), "Test rows:", len(dataset.rows("test")))
+
+    # ─── 3) Save pipeline ──────────────────────────────────────────────────────
+    os.makedirs("models", exist_ok=True)
+    joblib.dump(pipeline, "models/preprocessor.pkl")
+
+    print(f"✅ Prepared training dataset at {dataset_dir} and saved the preprocessor.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the training dataset and the preprocessor")
+    parser.add_argument("--embed-reducer", choices=["pca", "projection", "none"], default=EMBED_REDUCER,
+                        help="How centroid embeddings are reduced before reaching the model")
+    parser.add_argument("--embed-dim", type=int, default=EMBED_COMPONENTS,
+                        help="Output dimension of the embedding branch")
+    args = parser.parse_args()
+    run(embed_reducer=args.embed_reducer, embed_dim=args.embed_dim)
@@ -1,49 +1,223 @@
+import os
+import json
+import time
+import argparse
 import numpy as np
 import joblib
+from joblib import Parallel, delayed
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.multioutput import MultiOutputClassifier
 from sklearn.metrics import classification_report
-from sklearn.model_selection import cross_validate
-from sklearn.metrics import make_scorer, f1_score, hamming_loss
-
-# ─── Load preprocessed data ─────────────────────────────────────────────────────
-X_train = np.load("data/processed/X_train.npy")
-y_train = np.load("data/processed/y_train.npy")
-X_test  = np.load("data/processed/X_test.npy")
-y_test  = np.load("data/processed/y_test.npy")
-
-# ─── Train multi‐output classifier ───────────────────────────────────────────────
-base  = RandomForestClassifier(n_estimators=200, random_state=42, n_jobs=-1)
-model = MultiOutputClassifier(base)
-model.fit(X_train, y_train)
-
-# ─── Evaluate ────────────────────────────────────────────────────────────────────
-y_pred = model.predict(X_test)
-print(classification_report(
-    y_test, y_pred,
-    target_names=["upskilling_grant","stipend","counseling_voucher"]
-))
-
-# load X_proc and y (instead of X_train/X_test—no split)
-X_proc = np.load("data/processed/X_proc.npy") 
-y      = np.load("data/processed/y.npy")
-
-scoring = {
-    "f1_macro": make_scorer(f1_score, average="macro", zero_division=0),
-    "hamming": make_scorer(hamming_loss)
-}
+from sklearn.model_selection import KFold, ParameterSampler
+from sklearn.metrics import f1_score, hamming_loss
 
-cv_results = cross_validate(
-    MultiOutputClassifier(RandomForestClassifier(n_estimators=200, random_state=42)),
-    X_proc,
-    y,
-    cv=3,
-    scoring=scoring
+from services.training_service.dataset import TrainingDataset, DATASET_DIR
+from services.training_service.compiled_forest import CompiledForest, export as export_compiled, COMPILED_PATH
+from services.training_service.model_registry import (
+    publish, PREPROCESSOR_FILE, MODEL_FILE, COMPILED_FILE,
 )
 
-print("CV F1-macro:", cv_results["test_f1_macro"])
-print("CV Hamming:", cv_results["test_hamming"])
+# ─── Config ───────────────────────────────────────────────────────────────────
+LABEL_NAMES = ["upskilling_grant", "stipend", "counseling_voucher"]
+PARAM_SPACE = {
+    "n_estimators": [50, 100, 200, 400],
+    "max_depth": [None, 8, 12, 16, 24],
+    "min_samples_leaf": [1, 2, 4, 8, 16],
+}
+LATENCY_CALLS = 50
+REPORT_PATH = "models/search_report.json"
+PREPROCESSOR_PATH = "models/preprocessor.pkl"
+
+
+def new_model(n_estimators=200, max_depth=None, min_samples_leaf=1, n_jobs=-1):
+    base = RandomForestClassifier(n_estimators=n_estimators, max_depth=max_depth,
+                                  min_samples_leaf=min_samples_leaf, random_state=42, n_jobs=n_jobs)
+    return MultiOutputClassifier(base)
+
+
+def predict_rows(model, dataset, rows):
+    """Predict for `rows` chunk by chunk; returns (y_true, y_pred)."""
+    y_true, y_pred = [], []
+    for _, X, y in dataset.iter_chunks(rows):
+        y_true.append(y)
+        y_pred.append(model.predict(X))
+    return np.concatenate(y_true), np.concatenate(y_pred)
+
+
+def single_row_latency_ms(model, X, calls=LATENCY_CALLS):
+    """
+    p50/p99 ms of one-row predict_proba: latency_* for the compiled forest
+    that /recommend serves, sklearn_latency_* for the pickled fallback.
+    """
+    compiled = CompiledForest.from_sklearn(model)
+    out = {}
+    for prefix, predict_proba in (("", compiled.predict_proba), ("sklearn_", model.predict_proba)):
+        times = []
+        for i in range(calls):
+            row = X[i % len(X)][None, :]
+            start = time.perf_counter()
+            predict_proba(row)
+            times.append((time.perf_counter() - start) * 1000)
+        out[f"{prefix}latency_p50_ms"] = float(np.percentile(times, 50))
+        out[f"{prefix}latency_p99_ms"] = float(np.percentile(times, 99))
+    return out
+
+
+# ─── Successive-halving search ────────────────────────────────────────────────
+def _fit_fold(params, X, y, fit_idx, val_idx, keep_model):
+    """One (candidate, fold) job; single-threaded so the pool owns the cores."""
+    model = new_model(**params, n_jobs=1)
+    start = time.perf_counter()
+    model.fit(X[fit_idx], y[fit_idx])
+    fit_s = time.perf_counter() - start
+    y_pred = model.predict(X[val_idx])
+    return {
+        "fit_s": fit_s,
+        "f1_macro": f1_score(y[val_idx], y_pred, average="macro", zero_division=0),
+        "hamming": hamming_loss(y[val_idx], y_pred),
+        "model": model if keep_model else None,
+    }
+
+
+def successive_halving(X, y, n_candidates=27, factor=3, cv=3, min_rows=None, n_jobs=-1, random_state=42):
+    """
+    Random candidates from PARAM_SPACE race on growing row budgets: each round
+    cross-validates every survivor in parallel (one job per candidate × fold),
+    then keeps the best 1/factor by F1-macro, until ≤ factor finalists remain
+    on the full data. Returns one record per round per candidate.
+    """
+    candidates = list(ParameterSampler(PARAM_SPACE, n_iter=n_candidates, random_state=random_state))
+    order = np.random.default_rng(random_state).permutation(len(X))
+    n_rounds, left = 1, len(candidates)
+    while left > factor:
+        left, n_rounds = left // factor, n_rounds + 1
+    min_rows = min_rows or max(cv * 10, len(X) // factor ** (n_rounds - 1))
+    records = []
+    with Parallel(n_jobs=n_jobs) as parallel:
+        for rnd in range(n_rounds):
+            n_rows = len(X) if rnd == n_rounds - 1 else min(len(X), min_rows * factor ** rnd)
+            rows = order[:n_rows]
+            folds = list(KFold(n_splits=cv).split(rows))
+            start = time.perf_counter()
+            out = parallel(delayed(_fit_fold)(params, X, y, rows[f], rows[v], keep_model=(k == 0))
+                           for params in candidates for k, (f, v) in enumerate(folds))
+            wall_s = time.perf_counter() - start
+            results = []
+            for c, params in enumerate(candidates):
+                folds_out = out[c * cv:(c + 1) * cv]
+                latency = single_row_latency_ms(folds_out[0]["model"], X[rows[folds[0][1]]])
+                results.append({
+                    "round": rnd, "rows": int(n_rows), "params": params,
+                    "fit_s": float(np.mean([o["fit_s"] for o in folds_out])),
+                    "f1_macro": float(np.mean([o["f1_macro"] for o in folds_out])),
+                    "hamming": float(np.mean([o["hamming"] for o in folds_out])),
+                    **latency,
+                })
+            del out
+            records.extend(results)
+            print(f"Round {rnd}: {len(candidates)} candidate(s) × {cv} folds on {n_rows} rows in {wall_s:.1f}s")
+            for r in sorted(results, key=lambda r: -r["f1_macro"]):
+                print(f"  f1={r['f1_macro']:.4f} hamming={r['hamming']:.4f} fit={r['fit_s']:.2f}s "
+                      f"p50={r['latency_p50_ms']:.2f}ms p99={r['latency_p99_ms']:.2f}ms "
+                      f"(sklearn p99={r['sklearn_latency_p99_ms']:.2f}ms) {r['params']}")
+            if rnd < n_rounds - 1:
+                keep = max(1, len(candidates) // factor)
+                ranked = sorted(range(len(candidates)), key=lambda c: -results[c]["f1_macro"])
+                candidates = [candidates[c] for c in ranked[:keep]]
+    return records
+
+
+def choose(records, latency_budget_ms=None):
+    """Best F1 in the latest round that has a candidate within the compiled-forest p99 budget."""
+    for rnd in sorted({r["round"] for r in records}, reverse=True):
+        pool = [r for r in records if r["round"] == rnd and
+                (latency_budget_ms is None or r["latency_p99_ms"] <= latency_budget_ms)]
+        if pool:
+            return max(pool, key=lambda r: r["f1_macro"])
+    raise RuntimeError(f"No candidate met the {latency_budget_ms} ms p99 latency budget")
+
+
+def run(dataset_dir=DATASET_DIR, n_candidates=27, factor=3, cv=3, latency_budget_ms=None, n_jobs=-1,
+        publish_model=True, activate=True):
+    dataset = TrainingDataset(dataset_dir)
+    train_rows, test_rows = dataset.rows("train"), dataset.rows("test")
+    print(f"Dataset: {len(dataset)} rows × {dataset.n_features} features "
+          f"(train={len(train_rows)}, test={len(test_rows)})")
+
+    # ─── Search hyperparameters on the training split ────────────────────────────
+    X_train, y_train = dataset.take(train_rows)
+    start = time.perf_counter()
+    records = successive_halving(X_train, y_train, n_candidates=n_candidates,
+                                 factor=factor, cv=cv, n_jobs=n_jobs)
+    search_s = time.perf_counter() - start
+    best = choose(records, latency_budget_ms)
+    print(f"Search took {search_s:.1f}s; selected {best['params']} "
+          f"(f1={best['f1_macro']:.4f}, p99={best['latency_p99_ms']:.2f}ms)")
+
+    # ─── Refit the chosen candidate once on the full training split ──────────────
+    model = new_model(**best["params"], n_jobs=n_jobs)
+    model.fit(X_train, y_train)
+    del X_train, y_train
+    for est in model.estimators_:              # single-row serving is faster without a thread pool
+        est.set_params(n_jobs=1)
+
+    # ─── Evaluate ────────────────────────────────────────────────────────────────
+    y_test, y_pred = predict_rows(model, dataset, test_rows)
+    print(classification_report(
+        y_test, y_pred,
+        target_names=dataset.label_names or LABEL_NAMES
+    ))
+    latency = single_row_latency_ms(model, dataset.take(test_rows[:LATENCY_CALLS])[0])
+    print(f"Test F1-macro: {f1_score(y_test, y_pred, average='macro', zero_division=0):.4f}  "
+          f"Hamming: {hamming_loss(y_test, y_pred):.4f}  "
+          f"compiled p50={latency['latency_p50_ms']:.2f}ms p99={latency['latency_p99_ms']:.2f}ms  "
+          f"sklearn p50={latency['sklearn_latency_p50_ms']:.2f}ms p99={latency['sklearn_latency_p99_ms']:.2f}ms")
+
+    # ─── Persist model and search report ─────────────────────────────────────────
+    os.makedirs("models", exist_ok=True)
+    joblib.dump(model, "models/recs_model.pkl")
+    with open(REPORT_PATH, "w") as f:
+        json.dump({"search_s": search_s, "latency_budget_ms": latency_budget_ms,
+                   "selected": best, "candidates": records}, f, indent=2, default=str)
+    print(f"✅ Model trained and saved to models/recs_model.pkl (report: {REPORT_PATH})")
+    export_compiled(model=model)
+
+    # ─── Publish preprocessor + model as one registry version ───────────────────
+    if publish_model:
+        preprocessor = joblib.load(PREPROCESSOR_PATH)
+        inputs = list(getattr(preprocessor, "feature_names_in_", []))
+        publish(
+            {PREPROCESSOR_FILE: PREPROCESSOR_PATH, MODEL_FILE: "models/recs_model.pkl",
+             COMPILED_FILE: COMPILED_PATH, "search_report.json": REPORT_PATH},
+            {"metrics": {"test_f1_macro": f1_score(y_test, y_pred, average="macro", zero_division=0),
+                         "test_hamming": hamming_loss(y_test, y_pred),
+                         "predict_p50_ms": latency["latency_p50_ms"],
+                         "predict_p99_ms": latency["latency_p99_ms"],
+                         "sklearn_predict_p50_ms": latency["sklearn_latency_p50_ms"],
+                         "sklearn_predict_p99_ms": latency["sklearn_latency_p99_ms"],
+                         "cv_f1_macro": best["f1_macro"], "cv_hamming": best["hamming"]},
+             "params": best["params"],
+             "feature_schema": {"inputs": [c for c in inputs if not c.startswith("emb_")],
+                                "embedding_dims": sum(c.startswith("emb_") for c in inputs),
+                                "n_model_features": dataset.n_features,
+                                "labels": dataset.label_names or LABEL_NAMES},
+             "dataset": {"path": dataset_dir, "rows": len(dataset),
+                         "train_rows": len(train_rows), "test_rows": len(test_rows)}},
+            make_current=activate,
+        )
+    return model
+
 
-# ─── Persist model ────────────────────────────────────────────────────────────────
-joblib.dump(model, "models/recs_model.pkl")
-print("✅ Model trained and saved to models/recs_model.pkl")
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Search, train and evaluate the recommendation model")
+    parser.add_argument("--candidates", type=int, default=27, help="Random candidates in the first round")
+    parser.add_argument("--factor", type=int, default=3, help="Keep 1/factor of candidates per round")
+    parser.add_argument("--cv", type=int, default=3, help="Folds per candidate")
+    parser.add_argument("--latency-budget-ms", type=float, default=None,
+                        help="Only select candidates whose compiled-forest single-row p99 is within this budget")
+    parser.add_argument("--n-jobs", type=int, default=-1, help="Parallel (candidate, fold) jobs; -1 = all cores")
+    parser.add_argument("--no-activate", action="store_true",
+                        help="Publish to the registry without switching the serving version")
+    args = parser.parse_args()
+    run(n_candidates=args.candidates, factor=args.factor, cv=args.cv,
+        latency_budget_ms=args.latency_budget_ms, n_jobs=args.n_jobs, activate=not args.no_activate)
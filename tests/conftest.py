@@ -0,0 +1,39 @@
+import os
+import uuid
+import pytest
+
+
+@pytest.fixture(scope="module")
+def pg_empty_engine():
+    """
+    Engine on a fresh, empty schema of TEST_DATABASE_URL; the schema is
+    dropped afterwards. Skipped without a database.
+    """
+    url = os.getenv("TEST_DATABASE_URL")
+    if not url:
+        pytest.skip("TEST_DATABASE_URL not set")
+    sqlalchemy = pytest.importorskip("sqlalchemy")
+
+    schema = f"test_{uuid.uuid4().hex[:12]}"
+    admin = sqlalchemy.create_engine(url)
+    try:
+        with admin.begin() as conn:
+            conn.execute(sqlalchemy.text(f"CREATE SCHEMA {schema}"))
+    except sqlalchemy.exc.OperationalError as e:
+        pytest.skip(f"test database unavailable: {e.orig}")
+    engine = sqlalchemy.create_engine(url, connect_args={"options": f"-csearch_path={schema}"})
+    try:
+        yield engine
+    finally:
+        engine.dispose()
+        with admin.begin() as conn:
+            conn.execute(sqlalchemy.text(f"DROP SCHEMA {schema} CASCADE"))
+        admin.dispose()
+
+
+@pytest.fixture(scope="module")
+def pg_engine(pg_empty_engine):
+    """pg_empty_engine with every migration applied."""
+    from utils import migrate
+    migrate.upgrade(engine=pg_empty_engine)
+    return pg_empty_engine
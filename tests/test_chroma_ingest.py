@@ -0,0 +1,130 @@
+"""chroma_ingest against an in-memory Chroma collection with a stub embedder."""
+import json
+import uuid
+
+import pytest
+
+np = pytest.importorskip("numpy")
+chromadb = pytest.importorskip("chromadb")
+pytest.importorskip("pandas")
+
+from services.ingestion_service import chroma_ingest
+from utils.centroid_store import CentroidStore, PendingCentroids
+
+DOCS = {  # source: (doc_id, applicant_key, text)
+    "alice_cv.txt": (1, "alice", "a" * 2500),     # 3 chunks
+    "alice_bank.txt": (2, "alice", "b" * 1000),   # 1 chunk
+    "bob_cv.txt": (3, "bob", "c" * 4200),         # 5 chunks
+}
+
+
+class StubEmbedder:
+    def embed_documents(self, texts):
+        return [[float(ord(t[0])), float(len(t))] for t in texts]
+
+
+class CountingCollection:
+    """Records the size of every write so the max-batch slicing can be checked."""
+
+    def __init__(self, collection):
+        self.collection, self.writes = collection, []
+
+    def upsert(self, ids, **kwargs):
+        self.writes.append(len(ids))
+        self.collection.upsert(ids=ids, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.collection, name)
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "data" / "processed").mkdir(parents=True)
+    manifest = []
+    for source, (_, _, body) in DOCS.items():
+        (tmp_path / source).write_text(body)
+        manifest.append({"source": source, "type": "text", "output": str(tmp_path / source)})
+    (tmp_path / "data" / "processed" / "manifest.json").write_text(json.dumps(manifest))
+    hashes = {source: "v1" for source in DOCS}
+    monkeypatch.setattr(chroma_ingest, "lookup_documents", lambda engine, manifest: {
+        (e["source"], None): (DOCS[e["source"]][0], DOCS[e["source"]][1], hashes[e["source"]]) for e in manifest})
+    collection = chromadb.EphemeralClient().create_collection(f"test-{uuid.uuid4().hex[:8]}")
+    return CountingCollection(collection), hashes, str(tmp_path / "centroids")
+
+
+def run(collection, centroids, **kwargs):
+    return chroma_ingest.ingest(engine=object(), collection=collection, embedder=StubEmbedder(),
+                                centroid_path=centroids, concurrency=1, max_batch=2, **kwargs)
+
+
+def expected_mean(collection, key):
+    got = collection.get(where={"applicant_key": key}, include=["embeddings"])
+    return np.asarray(got["embeddings"]).mean(axis=0)
+
+
+def test_adds_are_capped_and_unchanged_documents_skipped(workspace):
+    collection, hashes, centroids = workspace
+    assert run(collection, centroids)["chunks"] == 9
+    assert collection.count() == 9 and max(collection.writes) <= 2
+
+    hashes["bob_cv.txt"] = "v2"
+    result = run(collection, centroids)
+    assert (result["chunks"], result["skipped"]) == (5, 2)
+    assert collection.count() == 9
+    store = CentroidStore(centroids)
+    for key in ("alice", "bob"):
+        np.testing.assert_allclose(store.mean(key), expected_mean(collection, key), rtol=1e-6)
+
+
+def test_crash_before_centroid_flush_is_recovered(workspace, monkeypatch):
+    collection, hashes, centroids = workspace
+
+    def crash(*args):
+        raise RuntimeError("killed")
+
+    with monkeypatch.context() as m, pytest.raises(RuntimeError):
+        m.setattr(chroma_ingest, "update_centroids", crash)
+        run(collection, centroids)
+    assert collection.count() == 9
+    assert "alice" not in CentroidStore(centroids)
+
+    # Nothing changed in Chroma since, but the journal names both applicants
+    assert run(collection, centroids)["skipped"] == 3
+    store = CentroidStore(centroids)
+    for key in ("alice", "bob"):
+        np.testing.assert_allclose(store.mean(key), expected_mean(collection, key), rtol=1e-6)
+    with PendingCentroids(centroids) as journal:
+        assert journal.orphaned() == set()
+        journal.done()
+
+
+def test_live_journal_is_not_an_orphan(tmp_path):
+    with PendingCentroids(str(tmp_path)) as live:
+        live.add({"alice"})
+        with PendingCentroids(str(tmp_path)) as other:
+            assert other.orphaned() == set()
+            other.done()
+    with PendingCentroids(str(tmp_path)) as later:
+        assert later.orphaned() == {"alice"}
+        later.done()
+
+
+def test_leftover_chunks_are_overwritten(workspace):
+    collection, hashes, centroids = workspace
+    # Left by an older ingest without doc_id metadata, so the lookup cannot see it
+    collection.add(ids=["3-0"], embeddings=[[0.0, 0.0]], documents=["stale"],
+                   metadatas=[{"applicant_key": "bob"}])
+    run(collection, centroids)
+    got = collection.get(ids=["3-0"], include=["embeddings", "documents"])
+    assert got["documents"] == ["c" * 1000]
+    np.testing.assert_allclose(got["embeddings"][0], [ord("c"), 1000])
+
+
+def test_partially_written_document_is_rewritten(workspace):
+    collection, hashes, centroids = workspace
+    run(collection, centroids)
+    collection.delete(ids=["3-3", "3-4"])                # a run died after writing 3 of bob's 5 chunks
+    result = run(collection, centroids)
+    assert (result["chunks"], result["skipped"]) == (5, 2)
+    assert collection.count() == 9
@@ -0,0 +1,65 @@
+"""Parity of CompiledForest with the sklearn forests it was flattened from."""
+import pytest
+
+np = pytest.importorskip("numpy")
+RandomForestClassifier = pytest.importorskip("sklearn.ensemble").RandomForestClassifier
+MultiOutputClassifier = pytest.importorskip("sklearn.multioutput").MultiOutputClassifier
+
+from services.training_service.compiled_forest import CompiledForest, SMALL_BATCH_PAIRS
+
+
+def sklearn_proba(model, X):
+    out = np.zeros((len(X), len(model.estimators_)))
+    for i, (probs, est) in enumerate(zip(model.predict_proba(X), model.estimators_)):
+        classes = list(est.classes_)
+        if 1 in classes:
+            out[:, i] = probs[:, classes.index(1)]
+    return out
+
+
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.default_rng(0)
+    X = rng.standard_normal((600, 6)).astype(np.float32)
+    Y = np.column_stack([
+        X[:, 0] + rng.normal(0, 1, len(X)) > 0,        # noisy: impure leaves, near-ties
+        X[:, 1] * X[:, 2] > 0.3,
+        X[:, 3] > 10,                                   # never true: single-class forest
+    ]).astype(int)
+    X_test = rng.standard_normal((4 * SMALL_BATCH_PAIRS // 20, 6)).astype(np.float32)
+    return X, Y, X_test
+
+
+# An even number of fully grown trees makes exact 0.5 ties common
+@pytest.mark.parametrize("params", [
+    {"n_estimators": 20, "max_depth": None, "min_samples_leaf": 1},
+    {"n_estimators": 10, "max_depth": 4, "min_samples_leaf": 8},
+])
+def test_matches_sklearn(data, params):
+    X, Y, X_test = data
+    model = MultiOutputClassifier(RandomForestClassifier(random_state=0, **params)).fit(X, Y)
+    compiled = CompiledForest.from_sklearn(model)
+
+    for rows in (X_test[:1], X_test[:50], X_test):     # single row, small and large batch paths
+        np.testing.assert_allclose(compiled.predict_proba(rows), sklearn_proba(model, rows), rtol=0, atol=1e-12)
+        np.testing.assert_array_equal(compiled.predict(rows), model.predict(rows))
+
+
+def test_ties_follow_argmax(data):
+    X, Y, X_test = data
+    model = MultiOutputClassifier(RandomForestClassifier(n_estimators=20, random_state=0)).fit(X, Y)
+    compiled = CompiledForest.from_sklearn(model)
+    tied = sklearn_proba(model, X_test) == 0.5
+    assert tied.any()
+    # argmax over (P(0), P(1)) picks class 0 on a tie
+    assert (compiled.predict(X_test)[tied] == 0).all()
+
+
+def test_save_load_roundtrip(data, tmp_path):
+    X, Y, X_test = data
+    model = MultiOutputClassifier(RandomForestClassifier(n_estimators=6, random_state=0)).fit(X, Y)
+    compiled = CompiledForest.from_sklearn(model)
+    path = str(tmp_path / "forest.npz")
+    compiled.save(path)
+    loaded = CompiledForest.load(path)
+    np.testing.assert_array_equal(loaded.predict_proba(X_test), compiled.predict_proba(X_test))
@@ -0,0 +1,39 @@
+"""db_ingest's COPY loader against a throwaway schema (needs TEST_DATABASE_URL)."""
+import io
+from datetime import date
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+from sqlalchemy import text
+
+from services.ingestion_service.db_ingest import bulk_load, parse_credit_table, parse_resume_text
+
+
+@pytest.fixture(scope="module")
+def doc_id(pg_engine):
+    with pg_engine.begin() as conn:
+        return conn.execute(text("INSERT INTO raw_documents (applicant_key, filename, file_type) "
+                                 "VALUES ('a', 'a_credit_report.xlsx', 'table') RETURNING id")).scalar()
+
+
+def test_float_integer_columns_from_csv(pg_engine, doc_id):
+    # read_csv turns an integer column with a blank cell into float64: 720.0, NaN
+    df = parse_credit_table(pd.read_csv(io.StringIO("credit_score,utilization_pct,inquiries_last_12m\n"
+                                                    "720,31.5,2\n,,\n649.6,12,\n")))
+    assert df["credit_score"].dtype == "float64"
+    with pg_engine.begin() as conn:
+        bulk_load(conn, "credit_reports", df.assign(doc_id=float(doc_id)))
+        rows = conn.execute(text("SELECT credit_score, utilization_pct, inquiries_last_12m FROM credit_reports "
+                                 "WHERE doc_id = :d ORDER BY credit_score NULLS LAST"), {"d": doc_id}).all()
+    assert [(s, None if u is None else float(u), i) for s, u, i in rows] == \
+        [(650, 12.0, None), (720, 31.5, 2), (None, None, None)]
+
+
+def test_parsed_resume(pg_engine, doc_id):
+    df = parse_resume_text("Date of Birth: 17 May 1990\nNationality: Emirati\n12 years of experience")
+    with pg_engine.begin() as conn:
+        bulk_load(conn, "resumes", df.assign(doc_id=doc_id))
+        row = conn.execute(text("SELECT dob, nationality, total_experience_years, current_position "
+                                "FROM resumes WHERE doc_id = :d"), {"d": doc_id}).one()
+    assert tuple(row) == (date(1990, 5, 17), "Emirati", 12, None)
@@ -0,0 +1,40 @@
+"""FastPreprocessor must reproduce the fitted sklearn preprocessor's transform()."""
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+pytest.importorskip("sklearn")
+from sklearn.impute import SimpleImputer
+
+from services.training_service.fast_preprocessor import compile_preprocessor
+from services.training_service.prepare_training_data import build_preprocessor, NUMERIC_COLS
+
+
+def features(rows, seed):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(rng.normal(50, 20, (rows, len(NUMERIC_COLS))), columns=NUMERIC_COLS)
+    df.loc[rng.random(rows) < 0.2, "credit_score"] = np.nan
+    df["family_size"] = np.nan                  # feature_engineering never fills it
+    return df
+
+
+@pytest.mark.parametrize("keep_empty", [False, True])
+def test_all_nan_column_matches_transform(keep_empty):
+    pipeline = build_preprocessor()
+    if keep_empty:
+        pipeline.set_params(columntransformer__num__simpleimputer__keep_empty_features=True)
+    pipeline.fit(features(200, 0))
+    fast = compile_preprocessor(pipeline)
+    assert fast is not None
+
+    X = features(50, 1)
+    expected = pipeline.transform(X)
+    assert expected.shape[1] == len(NUMERIC_COLS) - (not keep_empty)
+    np.testing.assert_allclose(fast.transform(X.to_numpy()), expected, rtol=1e-12, atol=1e-12)
+
+
+def test_other_shapes_are_not_compiled():
+    pipeline = build_preprocessor()
+    pipeline.set_params(columntransformer__num__simpleimputer=SimpleImputer(add_indicator=True))
+    pipeline.fit(features(50, 0).assign(family_size=1.0))
+    assert compile_preprocessor(pipeline) is None
@@ -0,0 +1,83 @@
+"""FEATURES_SQL / compute_features against seeded documents (needs TEST_DATABASE_URL)."""
+from datetime import date
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+from sqlalchemy import text
+
+from services.preprocessing_service.feature_engineering import compute_features, FEATURE_COLUMNS
+
+DOCS = [
+    # id, applicant_key, filename, file_type, sheet_name
+    (1, "A-001", "A-001_bank.xlsx", "table", "Transactions"),
+    (2, "A-001", "A-001_assets.xlsx", "table", "ASSETS"),          # sheet names compare case-insensitively
+    (3, "A-001", "A-001_assets.xlsx", "table", "Liabilities"),
+    (4, "A-001", "A-001 credit report.pdf", "text", None),
+    (5, "A-001", "A-001_resume.pdf", "text", None),
+    (6, "B-002", "B-002_resume.pdf", "text", None),                 # only a resume, with NULLs
+    (7, "C-003", "C-003_bank.xlsx", "table", "Transactions"),
+    (8, "C-003", "C-003_credit_1.pdf", "text", None),
+    (9, "C-003", "C-003_credit_2.pdf", "text", None),
+    (10, "D-004", "D-004_assets.xlsx", "table", "Other"),           # neither assets nor liabilities
+]
+
+
+def age_on(dob, today):
+    return today.year - dob.year - ((today.month, today.day) < (dob.month, dob.day))
+
+
+@pytest.fixture(scope="module")
+def engine(pg_engine):
+    with pg_engine.begin() as conn:
+        conn.execute(text("INSERT INTO raw_documents (id, applicant_key, filename, file_type, sheet_name) "
+                          "VALUES (:id, :ak, :fn, :ft, :sn)"),
+                     [dict(zip(("id", "ak", "fn", "ft", "sn"), d)) for d in DOCS])
+        conn.execute(text("INSERT INTO bank_transactions (doc_id, amount) VALUES (:d, :a)"),
+                     [{"d": 1, "a": 100.5}, {"d": 1, "a": -30}, {"d": 1, "a": 200}, {"d": 1, "a": None},
+                      {"d": 7, "a": -5.25}])
+        conn.execute(text("INSERT INTO assets_liabilities (doc_id, category, value) VALUES (:d, :c, :v)"),
+                     [{"d": 2, "c": "House", "v": 1000}, {"d": 2, "c": "Car", "v": 0.5},
+                      {"d": 3, "c": "Loan", "v": 250.25}, {"d": 3, "c": "Card", "v": None},
+                      {"d": 10, "c": "Misc", "v": 99}])
+        conn.execute(text("INSERT INTO credit_reports (doc_id, credit_score) VALUES (:d, :s)"),
+                     [{"d": 4, "s": 720}, {"d": 9, "s": 610}, {"d": 8, "s": 655}, {"d": 8, "s": 700}])
+        conn.execute(text("INSERT INTO resumes (doc_id, dob, total_experience_years) VALUES (:d, :dob, :e)"),
+                     [{"d": 5, "dob": date(1990, 5, 17), "e": 8},
+                      {"d": 6, "dob": None, "e": None}])
+    return pg_engine
+
+
+def expected(today=None):
+    today = today or date.today()
+    rows = [
+        ("A-001", 300.5, 750.25, 720, age_on(date(1990, 5, 17), today), 8, None),
+        ("B-002", 0.0, 0.0, None, None, None, None),
+        ("C-003", 0.0, 0.0, 655, None, None, None),   # lowest doc_id, then first row inserted
+        ("D-004", 0.0, 0.0, None, None, None, None),
+    ]
+    return [dict(zip(FEATURE_COLUMNS, row)) for row in rows]
+
+
+def normalized(df):
+    """Plain Python values (NUMERIC → float, Int64 → int, <NA>/NaN → None) for comparison."""
+    casts = {"income": float, "net_worth": float, "credit_score": int, "age": int, "experience_years": int}
+    return [{col: None if pd.isna(v) else casts.get(col, lambda x: x)(v) for col, v in row.items()}
+            for row in df.astype(object).to_dict("records")]
+
+
+def test_all_applicants(engine):
+    got = compute_features(engine)
+    assert list(got.columns) == FEATURE_COLUMNS
+    assert normalized(got) == expected()
+
+
+def test_scoped_to_applicants(engine):
+    got = compute_features(engine, {"C-003", "A-001", "Z-999"})
+    assert normalized(got) == [r for r in expected() if r["applicant_key"] in {"A-001", "C-003"}]
+
+
+def test_nullable_integer_columns(engine):
+    got = compute_features(engine)
+    for col in ("credit_score", "age", "experience_years"):
+        assert str(got[col].dtype) == "Int64"
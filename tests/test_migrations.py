@@ -0,0 +1,66 @@
+"""Migration scripts up and down on a throwaway schema (needs TEST_DATABASE_URL)."""
+import pytest
+
+pytest.importorskip("sqlalchemy")
+from sqlalchemy import text
+
+from utils import migrate
+
+
+def primary_key(conn, table):
+    return conn.execute(text(
+        """
+        SELECT a.attname FROM pg_index i
+          JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = ANY(i.indkey)
+         WHERE i.indrelid = CAST(:t AS regclass) AND i.indisprimary
+        """
+    ), {"t": table}).scalars().all()
+
+
+def test_0002_compacts_old_duplicates(pg_empty_engine):
+    engine = pg_empty_engine
+    migrate.downgrade(0, engine=engine)
+    migrate.upgrade(target=1, engine=engine)
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO raw_documents (id, applicant_key, filename, file_type, sheet_name) "
+                          "VALUES (1, 'a', 'a.xlsx', 'table', 'Assets'), (2, 'a', 'a.xlsx', 'table', 'Assets'), "
+                          "(3, 'a', 'a.pdf', 'text', NULL), (4, 'a', 'a.pdf', 'text', NULL)"))
+        conn.execute(text("INSERT INTO assets_liabilities (doc_id, category, value) "
+                          "VALUES (1, 'House', 10), (2, 'House', 20), (2, 'House', 20), (2, 'Car', NULL), "
+                          "(2, 'Car', NULL)"))
+        conn.execute(text("INSERT INTO credit_reports (doc_id, credit_score) VALUES (3, 600), (4, 700)"))
+
+    migrate.upgrade(target=2, engine=engine)
+    with engine.begin() as conn:
+        assert conn.execute(text("SELECT id FROM raw_documents ORDER BY id")).scalars().all() == [2, 4]
+        assert conn.execute(text("SELECT doc_id, category, value FROM assets_liabilities "
+                                 "ORDER BY category")).all() == [(2, "Car", None), (2, "House", 20)]
+        assert conn.execute(text("SELECT doc_id, credit_score FROM credit_reports")).all() == [(4, 700)]
+
+
+def test_round_trip_keeps_labels(pg_empty_engine):
+    engine = pg_empty_engine
+    migrate.downgrade(0, engine=engine)
+    migrate.upgrade(engine=engine)
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO recommendation_labels "
+                          "(applicant_key, upskilling_grant, stipend, counseling_voucher) "
+                          "VALUES ('b', true, false, true), ('a', false, false, false)"))
+        assert primary_key(conn, "recommendation_labels") == ["applicant_key"]
+
+    migrate.downgrade(2, engine=engine)
+    with engine.begin() as conn:
+        assert primary_key(conn, "recommendation_labels") == ["applicant_id"]
+        assert conn.execute(text("SELECT applicant_id, applicant_key FROM recommendation_labels "
+                                 "ORDER BY applicant_id")).all() == [(1, "a"), (2, "b")]
+
+    migrate.upgrade(engine=engine)
+    with engine.begin() as conn:
+        assert primary_key(conn, "recommendation_labels") == ["applicant_key"]
+        assert conn.execute(text("SELECT count(*) FROM recommendation_labels")).scalar() == 2
+        indexes = conn.execute(text("SELECT indexname FROM pg_indexes WHERE schemaname = current_schema() "
+                                    "AND tablename = 'application_features'")).scalars().all()
+        assert indexes == ["application_features_pkey"]
+
+    migrate.downgrade(0, engine=engine)
+    migrate.upgrade(engine=engine)
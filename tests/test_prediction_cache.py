@@ -0,0 +1,75 @@
+"""PredictionCache invalidation across processes and the API's cache-first lookup."""
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from utils.prediction_cache import PredictionCache
+
+
+@pytest.fixture
+def shared(tmp_path):
+    return str(tmp_path / "predictions.sqlite")
+
+
+def cached(cache, applicant_key, model_version="v1"):
+    version = cache.feature_versions([applicant_key])[applicant_key]
+    return cache.get(cache.key(applicant_key, version, model_version))
+
+
+def store(cache, applicant_key, result, model_version="v1"):
+    version = cache.feature_versions([applicant_key])[applicant_key]
+    cache.put(cache.key(applicant_key, version, model_version), result)
+
+
+def test_invalidation_reaches_other_processes(shared):
+    api, pipeline = PredictionCache(shared_path=shared), PredictionCache(shared_path=shared)
+    store(api, "a", {"eligible": True})
+    store(api, "b", {"eligible": False})
+    assert cached(api, "a") == {"eligible": True}
+
+    pipeline.invalidate(["a"])
+    assert cached(api, "a") is None                      # the API's in-process entry is dead too
+    assert cached(api, "b") == {"eligible": False}
+    assert cached(api, "b", model_version="v2") is None
+
+    pipeline.invalidate()                                # rebuild: every applicant
+    assert cached(api, "b") is None
+
+
+def test_in_process_only():
+    cache = PredictionCache(shared_path="")
+    store(cache, "a", {"eligible": True})
+    assert cached(cache, "a") == {"eligible": True}
+    cache.invalidate({"a"})
+    assert cached(cache, "a") is None and cache.stats()["invalidations"] == 1
+
+
+def test_hits_skip_the_feature_query(shared, monkeypatch):
+    pytest.importorskip("fastapi")
+    from services.fastapi_service import recommendation_api as api
+
+    class Bundle:
+        version = "v1"
+
+    fetched = []
+
+    def load_features_from_db(keys):
+        fetched.append(sorted(keys))
+        known = [k for k in keys if k != "ghost"]
+        return known, np.zeros((len(known), len(api.FEATURE_COLS)))
+
+    cache = PredictionCache(shared_path=shared)
+    monkeypatch.setattr(api, "get_prediction_cache", lambda: cache)
+    monkeypatch.setattr(api, "get_models", lambda: type("Watcher", (), {"get": lambda self: Bundle()})())
+    monkeypatch.setattr(api, "load_features_from_db", load_features_from_db)
+    monkeypatch.setattr(api, "score_matrix", lambda bundle, keys, X: np.full((len(keys), 3), 0.75))
+
+    _, first = api.recommend_many(["a", "b", "ghost"])
+    _, second = api.recommend_many(["b", "a"])
+    assert fetched == [["a", "b", "ghost"]]
+    assert [r["applicant_key"] for r in second] == ["b", "a"] and second[0]["eligible"]
+    assert first[2]["error"]
+
+    PredictionCache(shared_path=shared).invalidate(["a"])     # feature_engineering in another process
+    api.recommend_many(["a", "b"])
+    assert fetched == [["a", "b", "ghost"], ["a"]]
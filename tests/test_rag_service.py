@@ -0,0 +1,40 @@
+"""RagService.search scoping against an in-memory Chroma collection."""
+import uuid
+
+import pytest
+
+np = pytest.importorskip("numpy")
+chromadb = pytest.importorskip("chromadb")
+
+from services.rag_service.rag_service import RagService
+from utils.applicants import normalize_key
+
+
+@pytest.fixture(scope="module")
+def service():
+    collection = chromadb.EphemeralClient().create_collection(f"test-{uuid.uuid4().hex[:8]}")
+    collection.add(ids=["1-0", "1-1", "2-0"], embeddings=[[0.0, 0.0], [1.0, 1.0], [0.1, 0.1]],
+                   documents=["ahmad cv", "ahmad bank", "zara cv"],
+                   metadatas=[{"applicant_key": "ahmad"}, {"applicant_key": "ahmad"},
+                              {"applicant_key": "zara"}])
+    svc = RagService(top_k=4)
+    svc.collection, svc.chain = collection, object()      # skip opening Ollama/LangChain
+    return svc
+
+
+@pytest.mark.parametrize("typed", ["ahmad", "Ahmad", "  AHMAD "])
+def test_typed_key_finds_applicant_chunks(service, typed):
+    ids, docs, metas, dist = service.search([0.0, 0.0], typed)
+    assert ids == ["1-0", "1-1"]
+    assert {m["applicant_key"] for m in metas} == {"ahmad"}
+    np.testing.assert_allclose(dist, [0.0, 2.0])
+
+
+@pytest.mark.parametrize("typed", [None, "", "   ", "nobody"])
+def test_blank_or_unknown_key_finds_nothing(service, typed):
+    assert service.search([0.0, 0.0], typed)[0] == []
+
+
+def test_normalize_key():
+    assert normalize_key(" Ahmad ") == "ahmad"
+    assert normalize_key("  ") is None and normalize_key(None) is None
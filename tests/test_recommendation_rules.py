@@ -0,0 +1,85 @@
+"""The declarative label rules compiler."""
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+
+from services.preprocessing_service.recommendation_rules import RULES_PATH, compile_rules, load_rules
+
+
+def features():
+    return pd.DataFrame({
+        "income": pd.array([10000, 30000, None, 25000], dtype="Int64"),
+        "credit_score": pd.array([700, 550, 650, None], dtype="Int64"),
+        "experience_years": [1.0, 6.0, np.nan, 5.0],
+        "nationality": ["UAE", "India", None, "UAE"],
+    }, index=["a", "b", "c", "d"])
+
+
+def evaluate(label, fill_na=None, df=None):
+    rules = {"version": "t", "labels": {"x": label}, **({"fill_na": fill_na} if fill_na else {})}
+    out = compile_rules(rules)(features() if df is None else df)
+    assert list(out.index) == ["a", "b", "c", "d"] and out["x"].dtype == bool
+    return out["x"].tolist()
+
+
+@pytest.mark.parametrize("op, value, expected", [
+    ("<", 25000, [True, False, False, False]),
+    ("<=", 25000, [True, False, False, True]),
+    (">", 25000, [False, True, False, False]),
+    (">=", 25000, [False, True, False, True]),
+    ("==", 30000, [False, True, False, False]),
+    ("!=", 30000, [True, False, True, True]),        # NaN != x is True, as in NumPy
+])
+def test_comparisons_on_nullable_int(op, value, expected):
+    assert evaluate({"feature": "income", "op": op, "value": value}) == expected
+
+
+def test_in():
+    assert evaluate({"feature": "nationality", "in": ["UAE"]}) == [True, False, False, True]
+    assert evaluate({"feature": "credit_score", "in": [550, 650]}) == [False, True, True, False]
+
+
+def test_all_any_not_nesting():
+    label = {"any": [
+        {"all": [{"feature": "income", "op": "<", "value": 25000},
+                 {"feature": "credit_score", "op": ">", "value": 600}]},
+        {"not": {"feature": "experience_years", "op": "<", "value": 5}},
+    ]}
+    # a: both parts of "all"; b, d: experience >= 5; c: NaN experience → not(False)
+    assert evaluate(label) == [True, True, True, True]
+    assert evaluate({"not": label}) == [False, False, False, False]
+
+
+def test_fill_na():
+    label = {"feature": "income", "op": "<", "value": 25000}
+    assert evaluate(label) == [True, False, False, False]
+    assert evaluate(label, fill_na={"income": 0}) == [True, False, True, False]
+    assert evaluate({"feature": "experience_years", "op": ">=", "value": 5},
+                    fill_na={"experience_years": 9}) == [False, True, True, True]
+
+
+def test_missing_column():
+    with pytest.raises(KeyError, match="family_size"):
+        evaluate({"feature": "family_size", "op": ">=", "value": 4})
+
+
+@pytest.mark.parametrize("label, message", [
+    ({"feature": "income", "op": "~", "value": 1}, "unsupported op"),
+    ({"op": "<", "value": 1}, "needs 'feature'"),
+    ({"all": []}, "empty combination"),
+])
+def test_invalid_rules(label, message):
+    with pytest.raises(ValueError, match=message):
+        compile_rules({"version": "t", "labels": {"x": label}})
+
+
+def test_shipped_rule_set():
+    evaluate_rules = compile_rules(load_rules(RULES_PATH))
+    df = pd.DataFrame({"income": pd.array([20000, None], dtype="Int64"),
+                       "credit_score": pd.array([None, 700], dtype="Int64"),
+                       "family_size": pd.array([None, 5], dtype="Int64"),
+                       "experience_years": pd.array([7, None], dtype="Int64")})
+    out = evaluate_rules(df)
+    assert out.to_dict("list") == {"upskilling_grant": [False, True], "stipend": [False, True],
+                                   "counseling_voucher": [True, False]}
@@ -0,0 +1,32 @@
+import os
+
+
+def applicant_key_for(filename: str) -> str:
+    """
+    Derive the applicant key from an upload's file name: the last
+    underscore-separated segment of the stem, lower-cased.
+    e.g. 'bank_statement_Zeeshan.pdf' → 'zeeshan'
+    """
+    base = os.path.splitext(os.path.basename(filename))[0]
+    return base.split('_')[-1].lower()
+
+
+def normalize_key(applicant_key):
+    """One typed key in the form ingest stores it ('  Ahmad ' → 'ahmad'); None if blank."""
+    if not applicant_key or not applicant_key.strip():
+        return None
+    return applicant_key.strip().lower()
+
+
+def normalize_keys(applicant_keys):
+    """None (= every applicant) or a set of lower-cased keys."""
+    if applicant_keys is None:
+        return None
+    if isinstance(applicant_keys, str):
+        applicant_keys = [applicant_keys]
+    return {normalize_key(k) for k in applicant_keys if normalize_key(k)}
+
+
+def in_scope(filename: str, applicant_keys) -> bool:
+    """True if the file belongs to one of applicant_keys (None matches all)."""
+    return applicant_keys is None or applicant_key_for(filename) in applicant_keys
@@ -0,0 +1,319 @@
+import os
+import json
+import uuid
+import fcntl
+import argparse
+import numpy as np
+
+from utils.resources import CHROMA_DIR, CHROMA_COLLECTION
+
+# ─── Config ───────────────────────────────────────────────────────────────────
+CENTROID_DIR = os.getenv("CENTROID_DIR", "data/processed/centroids")
+CENTROID_DTYPE = os.getenv("CENTROID_DTYPE", "float32")     # or float16
+EMBED_PAGE_SIZE = int(os.getenv("EMBED_PAGE_SIZE", "1000"))
+INITIAL_CAPACITY = 1024
+
+
+class CentroidStore:
+    """
+    Per-applicant embedding centroids kept on disk as a memory-mapped matrix:
+
+      index.json          {"dim", "dtype", "file", "size", "keys": [...], "rows": [...]}
+      means-<gen>.npy     (capacity, dim) float32/float16, rows referenced by index.json
+
+    Published rows are never modified. A writer appends each new centroid as
+    a fresh row past `size` and makes it visible by atomically replacing
+    index.json, so a reader sees either the old or the new centroid, never a
+    half-written one. Growing or compacting the matrix writes a new
+    generation file. The old file is unlinked only after index.json points
+    away from it, and readers that still map it keep a valid copy.
+
+    Only one writer runs at a time: mode="w" holds an exclusive flock on
+    `.writer.lock` until close(), so concurrent ingest runs queue up instead
+    of allocating the same rows. Readers take no lock.
+    """
+
+    def __init__(self, path=CENTROID_DIR, mode="r", dtype=None):
+        self.path, self.mode, self._dtype = path, mode, dtype
+        self._lock_file = None
+        if mode == "w":
+            os.makedirs(path, exist_ok=True)
+            self._lock_file = open(os.path.join(path, ".writer.lock"), "w")
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+        self._load()
+
+    def _load(self):
+        index_path = os.path.join(self.path, "index.json")
+        while True:
+            self._mtime = os.path.getmtime(index_path) if os.path.exists(index_path) else None
+            if self._mtime is None:
+                self.dim, self.dtype, self.file, self.size = None, np.dtype(self._dtype or CENTROID_DTYPE), None, 0
+                self.keys, self.means, self._pos = [], None, {}
+                return
+            with open(index_path, "r") as f:
+                index = json.load(f)
+            if "file" not in index:
+                raise RuntimeError(f"{self.path} uses the old running-sum layout; "
+                                   "run `python -m utils.centroid_store --rebuild` once")
+            self.dim, self.dtype = index["dim"], np.dtype(index["dtype"])
+            self.file, self.size = index["file"], index["size"]
+            self.keys = index["keys"]
+            self._pos = dict(zip(index["keys"], index["rows"]))
+            try:
+                self.means = np.load(os.path.join(self.path, self.file),
+                                     mmap_mode="r+" if self.mode == "w" else "r")
+                return
+            except FileNotFoundError:        # a writer replaced the generation between our two reads
+                continue
+
+    def refresh(self):
+        """Reader side: pick up a newer index.json written by the ingest process."""
+        index_path = os.path.join(self.path, "index.json")
+        mtime = os.path.getmtime(index_path) if os.path.exists(index_path) else None
+        if mtime != self._mtime:
+            self._load()
+        return self
+
+    def close(self):
+        self.means = None
+        if self._lock_file is not None:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+            self._lock_file.close()
+            self._lock_file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ─── Writer API ───────────────────────────────────────────────────────────
+    def _new_generation(self, capacity, live):
+        """Copy the `live` {key: row} centroids into a fresh file; returns the new mapping."""
+        gen = 0 if self.file is None else int(self.file[len("means-"):-len(".npy")]) + 1
+        name = f"means-{gen:06d}.npy"
+        new = np.lib.format.open_memmap(os.path.join(self.path, name), mode="w+",
+                                        dtype=self.dtype, shape=(capacity, self.dim))
+        pos = {}
+        for i, (key, row) in enumerate(live.items()):
+            new[i] = self.means[row]
+            pos[key] = i
+        new.flush()
+        self.means, self.file, self.size = new, name, len(pos)
+        return pos
+
+    def reset(self, dtype=None):
+        """Stage an empty store; the next flush publishes only what set() adds after this."""
+        if self.mode != "w":
+            raise PermissionError("CentroidStore opened read-only")
+        self._pos, self.dim = {}, None
+        if dtype is not None:
+            self.dtype = np.dtype(dtype)
+
+    def set(self, centroids):
+        """
+        Stage new centroids {applicant_key: (dim,) mean, or None to drop the
+        applicant}. Nothing is visible to readers until flush().
+        """
+        if self.mode != "w":
+            raise PermissionError("CentroidStore opened read-only")
+        for key, mean in centroids.items():
+            if mean is None:
+                self._pos.pop(key, None)
+                continue
+            mean = np.asarray(mean)
+            if self.dim is None:
+                self.dim = mean.shape[0]
+                self._pos = self._new_generation(INITIAL_CAPACITY, {})
+            elif mean.shape[0] != self.dim:
+                raise ValueError(f"Embedding dim {mean.shape[0]} does not match centroid store dim {self.dim}")
+            if self.size == len(self.means):
+                # Grow, dropping rows no key points at any more
+                self._pos = self._new_generation(max(INITIAL_CAPACITY, 2 * len(self._pos) + 1), self._pos)
+            self.means[self.size] = mean
+            self._pos[key] = self.size
+            self.size += 1
+
+    def flush(self):
+        """Publish staged centroids: sync the matrix, then swap index.json."""
+        if self.dim is None:
+            return
+        self.means.flush()
+        self.keys = list(self._pos)
+        index_path = os.path.join(self.path, "index.json")
+        with open(index_path + ".tmp", "w") as f:
+            json.dump({"dim": self.dim, "dtype": self.dtype.name, "file": self.file, "size": self.size,
+                       "keys": self.keys, "rows": [self._pos[k] for k in self.keys]}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(index_path + ".tmp", index_path)
+        self._mtime = os.path.getmtime(index_path)
+        for name in os.listdir(self.path):       # superseded generations
+            if name.startswith("means-") and name.endswith(".npy") and name != self.file:
+                os.remove(os.path.join(self.path, name))
+
+    # ─── Reader API ───────────────────────────────────────────────────────────
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, applicant_key):
+        return applicant_key in self._pos
+
+    def mean(self, applicant_key):
+        """Centroid for one applicant (float32 copy), or None if unknown."""
+        i = self._pos.get(applicant_key)
+        if i is None:
+            return None
+        return np.asarray(self.means[i], dtype=np.float32)
+
+    def matrix(self, applicant_keys, dim=None):
+        """(len(applicant_keys), dim) float32 centroids; zero rows for unknown keys."""
+        dim = self.dim or dim
+        if dim is None:
+            raise ValueError("Centroid store is empty and no fallback dim was given")
+        out = np.zeros((len(applicant_keys), dim), dtype=np.float32)
+        rows = np.array([self._pos.get(k, -1) for k in applicant_keys], dtype=np.int64)
+        hit = rows >= 0
+        if hit.any():
+            out[hit] = self.means[rows[hit]]
+        return out
+
+    def batches(self, batch_rows=EMBED_PAGE_SIZE):
+        """Yield (keys, float32 means) for every applicant with chunks, `batch_rows` at a time."""
+        for start in range(0, len(self.keys), batch_rows):
+            keys = self.keys[start:start + batch_rows]
+            yield keys, np.asarray(self.means[[self._pos[k] for k in keys]], dtype=np.float32)
+
+
+class PendingCentroids:
+    """
+    Crash journal for ingest runs, kept next to the store:
+
+      pending-<pid>-<id>.keys     one applicant key per line, appended + fsynced
+
+    A run lists an applicant here before it touches that applicant's chunks
+    in Chroma. It removes the file only after the recomputed centroids are
+    flushed. Each run holds an flock on its own file while it is alive. A
+    file that nobody holds belongs to a run that died between its Chroma
+    writes and its flush, and orphaned() hands those keys to the next run.
+    """
+
+    def __init__(self, path=CENTROID_DIR):
+        os.makedirs(path, exist_ok=True)
+        self.path, self.keys, self._orphans = path, set(), []
+        self.journal = os.path.join(path, f"pending-{os.getpid()}-{uuid.uuid4().hex[:8]}.keys")
+        # Lock under a private name first, so no other run sees the file unlocked
+        self.file = open(self.journal + ".tmp", "a")
+        fcntl.flock(self.file, fcntl.LOCK_EX)
+        os.rename(self.journal + ".tmp", self.journal)
+
+    def add(self, applicant_keys):
+        """Record keys durably; call before writing their chunks to Chroma."""
+        new = set(applicant_keys) - self.keys - {None}
+        if not new:
+            return
+        self.file.write("".join(f"{key}\n" for key in sorted(new)))
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.keys |= new
+
+    def orphaned(self):
+        """Keys journaled by runs that died before flushing their centroids."""
+        keys = set()
+        for name in os.listdir(self.path):
+            full = os.path.join(self.path, name)
+            if not (name.startswith("pending-") and name.endswith(".keys")) or full == self.journal:
+                continue
+            try:
+                with open(full, "r") as f:
+                    fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)     # still held → that run is alive
+                    lines = f.read().split("\n")
+            except (BlockingIOError, FileNotFoundError):
+                continue
+            keys.update(line for line in lines[:-1] if line)         # a torn last line was never written to Chroma
+            self._orphans.append(full)
+        return keys
+
+    def done(self):
+        """The journaled centroids (and the orphans') are flushed: drop the journal files."""
+        for full in [self.journal] + self._orphans:
+            try:
+                os.remove(full)
+            except FileNotFoundError:
+                pass
+        self._orphans = []
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def centroids_from_collection(coll, applicant_keys, batch_keys=EMBED_PAGE_SIZE):
+    """
+    {applicant_key: mean embedding, or None when the applicant has no chunks},
+    recomputed from the applicant's chunks in Chroma. Reads only those
+    applicants' chunks: one metadata-filtered get per `batch_keys` applicants.
+    """
+    keys = sorted(set(applicant_keys))
+    out = dict.fromkeys(keys)
+    for start in range(0, len(keys), batch_keys):
+        batch = keys[start:start + batch_keys]
+        got = coll.get(where={"applicant_key": {"$in": batch}}, include=["embeddings", "metadatas"])
+        if not got["ids"]:
+            continue
+        arr = np.asarray(got["embeddings"], dtype=np.float64)
+        owners = np.array([m.get("applicant_key") for m in got["metadatas"]], dtype=object)
+        for key in batch:
+            mask = owners == key
+            if mask.any():
+                out[key] = arr[mask].mean(axis=0)
+    return out
+
+
+def rebuild_from_collection(coll, path=CENTROID_DIR, page_size=EMBED_PAGE_SIZE, dtype=None):
+    """
+    Recreate the store from the Chroma collection: one paginated metadata
+    pass for the applicant keys, then their centroids `page_size` applicants
+    at a time (memory is one batch of applicants' chunks + the store).
+    """
+    keys, offset = set(), 0
+    while True:
+        page = coll.get(include=["metadatas"], limit=page_size, offset=offset)
+        keys.update((m or {}).get("applicant_key") or "" for m in page["metadatas"])
+        offset += len(page["ids"])
+        if len(page["ids"]) < page_size:
+            break
+    keys.discard("")
+    with CentroidStore(path, mode="w", dtype=dtype) as store:
+        store.reset(dtype)
+        if keys:
+            store.set(centroids_from_collection(coll, keys, page_size))
+            store.flush()
+        else:
+            for name in os.listdir(path):
+                if name == "index.json" or name.startswith("means-"):
+                    os.remove(os.path.join(path, name))
+    return CentroidStore(path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-applicant embedding centroid store")
+    parser.add_argument("--rebuild", action="store_true",
+                        help=f"Rebuild from the '{CHROMA_COLLECTION}' Chroma collection")
+    parser.add_argument("--dtype", choices=["float32", "float16"], default=None,
+                        help="Storage dtype for centroid means when rebuilding")
+    args = parser.parse_args()
+
+    if args.rebuild:
+        from chromadb import PersistentClient
+        coll = PersistentClient(path=CHROMA_DIR).get_collection(CHROMA_COLLECTION)
+        store = rebuild_from_collection(coll, dtype=args.dtype)
+        print(f"✅ Rebuilt centroid store: {len(store)} applicants, dim={store.dim}, dtype={store.dtype}")
+    else:
+        store = CentroidStore()
+        print(f"{len(store)} applicants, dim={store.dim}, dtype={store.dtype} at {CENTROID_DIR}")
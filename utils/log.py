@@ -0,0 +1,27 @@
+import os
+import logging
+
+# ─── Config ───────────────────────────────────────────────────────────────────
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = "%(asctime)s level=%(levelname)s logger=%(name)s %(message)s"
+
+_configured = False
+
+
+def get_logger(name):
+    """
+    Logger configured once from LOG_LEVEL. Log with key=value messages and
+    %-style args (log.debug("result=%s", obj)): below the active level the
+    call returns before any formatting, so disabled debug logs cost ~nothing.
+    """
+    global _configured
+    if not _configured:
+        root = logging.getLogger("socialsupport")
+        if not root.handlers:
+            handler = logging.StreamHandler()
+            handler.setFormatter(logging.Formatter(LOG_FORMAT))
+            root.addHandler(handler)
+        root.setLevel(LOG_LEVEL)
+        root.propagate = False
+        _configured = True
+    return logging.getLogger(f"socialsupport.{name}")
@@ -0,0 +1,85 @@
+import os
+import time
+from functools import lru_cache
+from contextlib import contextmanager
+
+from prometheus_client import Counter, Histogram, CollectorRegistry, REGISTRY, generate_latest, CONTENT_TYPE_LATEST
+
+from utils.log import get_logger
+
+log = get_logger("metrics")
+
+# Port for processes without their own HTTP API (the Streamlit app); 0 disables
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9101"))
+
+# ─── Metric definitions ───────────────────────────────────────────────────────
+# Latency buckets span sub-millisecond model scoring up to multi-second LLM calls
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+STAGE_SECONDS = Histogram(
+    "recommend_stage_seconds", "Latency of one serving stage",
+    ["stage", "model_version"], buckets=BUCKETS,
+)   # stage: db_fetch | preprocess | score | rag_retrieval | llm_generation
+REQUEST_SECONDS = Histogram(
+    "recommend_request_seconds", "End-to-end handler latency",
+    ["endpoint", "model_version"], buckets=BUCKETS,
+)
+CACHE_LOOKUPS = Counter(
+    "recommend_cache_lookups_total", "Prediction cache lookups",
+    ["result", "model_version"],
+)   # result: hit | miss
+ERRORS = Counter(
+    "recommend_errors_total", "Failures by stage",
+    ["stage", "model_version"],
+)
+
+
+@contextmanager
+def timed(stage, model_version, histogram=STAGE_SECONDS):
+    """Observe the block's latency under (stage, model_version); count it as an error if it raises."""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        ERRORS.labels(stage, model_version).inc()
+        raise
+    finally:
+        histogram.labels(stage, model_version).observe(time.perf_counter() - start)
+
+
+def _registry():
+    """This process' metrics, or every process' when PROMETHEUS_MULTIPROC_DIR is set."""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def render():
+    """(body, content type) for /metrics, aggregating worker processes when
+    PROMETHEUS_MULTIPROC_DIR is set (uvicorn --workers N)."""
+    return generate_latest(_registry()), CONTENT_TYPE_LATEST
+
+
+@lru_cache(maxsize=1)
+def serve_metrics(port=METRICS_PORT):
+    """
+    Expose this process' metrics on http://0.0.0.0:<port>/metrics from a
+    background thread. Used by the Streamlit app, whose RAG and in-process
+    scoring stages never reach the API's /metrics. Memoized, so Streamlit
+    reruns start it once. Returns False if disabled or the port is taken.
+    """
+    if not port:
+        return False
+    from prometheus_client import start_http_server
+
+    try:
+        start_http_server(port, registry=_registry())
+    except OSError as e:
+        log.warning("metrics server not started port=%d error=%s", port, e)
+        return False
+    log.info("metrics server started port=%d", port)
+    return True
@@ -0,0 +1,106 @@
+import os
+import re
+import argparse
+from sqlalchemy import text
+
+from utils.resources import get_engine
+
+# ─── Config ───────────────────────────────────────────────────────────────────
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "migrations")
+FILE_PATTERN = re.compile(r"^(\d{4})_(\w+)\.(up|down)\.sql$")
+
+
+def discover(migrations_dir=MIGRATIONS_DIR):
+    """{version: {"name", "up", "down"}} for every NNNN_name.(up|down).sql file."""
+    migrations = {}
+    for fname in sorted(os.listdir(migrations_dir)):
+        m = FILE_PATTERN.match(fname)
+        if not m:
+            continue
+        version, name, direction = int(m.group(1)), m.group(2), m.group(3)
+        entry = migrations.setdefault(version, {"name": name})
+        entry[direction] = os.path.join(migrations_dir, fname)
+    for version, entry in migrations.items():
+        if "up" not in entry or "down" not in entry:
+            raise ValueError(f"Migration {version:04d}_{entry['name']} needs both up and down scripts")
+    return migrations
+
+
+def ensure_table(conn):
+    conn.execute(text(
+        """
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+          version    INTEGER PRIMARY KEY,
+          name       TEXT NOT NULL,
+          applied_at TIMESTAMP NOT NULL DEFAULT NOW()
+        )
+        """
+    ))
+
+
+def applied_versions(engine):
+    with engine.begin() as conn:
+        ensure_table(conn)
+        return set(conn.execute(text("SELECT version FROM schema_migrations")).scalars())
+
+
+def _apply(engine, version, entry, direction):
+    """Run one script and record it, atomically."""
+    with open(entry[direction], encoding="utf-8") as f:
+        sql = f.read()
+    with engine.begin() as conn:
+        conn.exec_driver_sql(sql)
+        if direction == "up":
+            conn.execute(text("INSERT INTO schema_migrations (version, name) VALUES (:v, :n)"),
+                         {"v": version, "n": entry["name"]})
+        else:
+            conn.execute(text("DELETE FROM schema_migrations WHERE version = :v"), {"v": version})
+    print(f"✔ {direction:<4} {version:04d}_{entry['name']}")
+
+
+def upgrade(target=None, engine=None):
+    """Apply every pending migration up to and including `target` (default: latest)."""
+    engine = engine or get_engine()
+    migrations, done = discover(), applied_versions(engine)
+    todo = [v for v in sorted(migrations) if v not in done and (target is None or v <= target)]
+    for version in todo:
+        _apply(engine, version, migrations[version], "up")
+    print(f"✅ Schema up to date ({len(todo)} migration(s) applied)")
+
+
+def downgrade(target, engine=None):
+    """Revert applied migrations newer than `target` (0 reverts everything)."""
+    engine = engine or get_engine()
+    migrations, done = discover(), applied_versions(engine)
+    todo = [v for v in sorted(done, reverse=True) if v > target]
+    for version in todo:
+        if version not in migrations:
+            raise FileNotFoundError(f"No scripts on disk for applied migration {version:04d}")
+        _apply(engine, version, migrations[version], "down")
+    print(f"✅ Schema at version {target:04d} ({len(todo)} migration(s) reverted)")
+
+
+def status(engine=None):
+    engine = engine or get_engine()
+    migrations, done = discover(), applied_versions(engine)
+    for version in sorted(migrations):
+        mark = "applied" if version in done else "pending"
+        print(f"{version:04d}_{migrations[version]['name']:<30} {mark}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Versioned schema migrations")
+    sub = parser.add_subparsers(dest="command", required=True)
+    up = sub.add_parser("up", help="Apply pending migrations")
+    up.add_argument("--to", type=int, default=None, help="Stop after this version")
+    down = sub.add_parser("down", help="Revert migrations")
+    down.add_argument("--to", type=int, required=True, help="Version to revert back to (0 = empty)")
+    sub.add_parser("status", help="List migrations and whether they are applied")
+    args = parser.parse_args()
+
+    if args.command == "up":
+        upgrade(args.to)
+    elif args.command == "down":
+        downgrade(args.to)
+    else:
+        status()
@@ -0,0 +1,175 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from functools import lru_cache
+from collections import OrderedDict
+
+# ─── Config ───────────────────────────────────────────────────────────────────
+CACHE_MAXSIZE = int(os.getenv("RECOMMEND_CACHE_SIZE", "100000"))
+CACHE_TTL_S = float(os.getenv("RECOMMEND_CACHE_TTL_S", "3600"))
+# sqlite file shared by every process on the host; "" = in-process only (single-process setups)
+CACHE_PATH = os.getenv("RECOMMEND_CACHE_PATH", "data/cache/predictions.sqlite")
+
+
+class PredictionCache:
+    """
+    LRU + TTL cache of per-applicant recommendation results, keyed by
+    (applicant_key, feature version, model version). A hit touches neither
+    Postgres nor the model:
+
+      - feature version: a per-applicant counter plus a global generation,
+        bumped by invalidate() after feature engineering commits new rows,
+        so stale entries are simply never addressed again
+      - model version: the registry version that produced the result; clear()
+        drops everything when the API swaps models
+
+    Versions and results live in the `shared_path` sqlite file, so API
+    workers, Streamlit and the ingestion pipeline see the same invalidations
+    and reuse each other's results; lookups and writes are batched per
+    request. Without it, invalidations only reach the process that made them.
+    """
+
+    def __init__(self, maxsize=CACHE_MAXSIZE, ttl_s=CACHE_TTL_S, shared_path=CACHE_PATH):
+        self.maxsize, self.ttl_s, self.shared_path = maxsize, ttl_s, shared_path
+        self._entries = OrderedDict()          # key → (expires_at, result)
+        self._versions = {}                    # in-process only: applicant_key ('' = generation) → version
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.hits = self.misses = self.invalidations = 0
+        if shared_path:
+            self._shared().executescript(
+                """
+                PRAGMA journal_mode=WAL;
+                CREATE TABLE IF NOT EXISTS feature_versions (applicant_key TEXT PRIMARY KEY, version INTEGER NOT NULL);
+                CREATE TABLE IF NOT EXISTS predictions (
+                  cache_key TEXT PRIMARY KEY, result TEXT NOT NULL, expires_at REAL NOT NULL
+                );
+                """
+            )
+
+    # ─── Shared backend ───────────────────────────────────────────────────────
+    def _shared(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.shared_path)), exist_ok=True)
+            conn = sqlite3.connect(self.shared_path, timeout=5, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    def feature_versions(self, applicant_keys):
+        """
+        {applicant_key: feature version}. Read them before the features: a
+        result computed from rows invalidated meanwhile then lands under an
+        already-dead key.
+        """
+        keys = list(dict.fromkeys(applicant_keys))
+        if self.shared_path:
+            marks = ",".join("?" * len(keys))
+            found = dict(self._shared().execute(
+                f"SELECT applicant_key, version FROM feature_versions WHERE applicant_key IN ('', {marks})",
+                keys).fetchall()) if keys else {}
+        else:
+            with self._lock:
+                found = dict(self._versions)
+        return {k: f"{found.get('', 0)}.{found.get(k, 0)}" for k in keys}
+
+    @staticmethod
+    def key(applicant_key, feature_version, model_version):
+        """Cache key for one applicant's feature version under one model version."""
+        return f"{applicant_key}|{feature_version}|{model_version}"
+
+    # ─── Lookups ──────────────────────────────────────────────────────────────
+    def get_many(self, keys):
+        """{key: result} for the keys that are cached; one sqlite query for local misses."""
+        now, found, missing = time.time(), {}, []
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] > now:
+                    self._entries.move_to_end(key)
+                    found[key] = entry[1]
+                    continue
+                if entry is not None:
+                    del self._entries[key]
+                missing.append(key)
+        if self.shared_path and missing:
+            marks = ",".join("?" * len(missing))
+            rows = self._shared().execute(
+                f"SELECT cache_key, result, expires_at FROM predictions "
+                f"WHERE cache_key IN ({marks}) AND expires_at > ?", (*missing, now)).fetchall()
+            for key, result, expires_at in rows:
+                found[key] = json.loads(result)
+                self._remember(key, expires_at, found[key])
+        with self._lock:
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def get(self, key):
+        return self.get_many([key]).get(key)
+
+    def put_many(self, items):
+        """Store {key: result}; one sqlite transaction for all of them."""
+        expires_at = time.time() + self.ttl_s
+        for key, result in items.items():
+            self._remember(key, expires_at, result)
+        if self.shared_path and items:
+            conn = self._shared()
+            with conn:
+                conn.execute("BEGIN")
+                conn.executemany("INSERT OR REPLACE INTO predictions VALUES (?, ?, ?)",
+                                 [(key, json.dumps(result), expires_at) for key, result in items.items()])
+
+    def put(self, key, result):
+        self.put_many({key: result})
+
+    def _remember(self, key, expires_at, result):
+        with self._lock:
+            self._entries[key] = (expires_at, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    # ─── Invalidation ─────────────────────────────────────────────────────────
+    def invalidate(self, applicant_keys=None):
+        """
+        Bump the feature versions of `applicant_keys` (None = every applicant).
+        Call after the feature rows are committed.
+        """
+        keys = [""] if applicant_keys is None else sorted(set(applicant_keys))
+        if not keys:
+            return
+        with self._lock:
+            for key in keys:
+                self._versions[key] = self._versions.get(key, 0) + 1
+            self.invalidations += len(keys)
+        if self.shared_path:
+            conn = self._shared()
+            with conn:
+                conn.execute("BEGIN")
+                conn.executemany("INSERT INTO feature_versions VALUES (?, 1) ON CONFLICT (applicant_key) "
+                                 "DO UPDATE SET version = version + 1", [(k,) for k in keys])
+
+    # ─── Maintenance ──────────────────────────────────────────────────────────
+    def clear(self):
+        """Drop all results (e.g. after a model swap)."""
+        with self._lock:
+            self._entries.clear()
+        if self.shared_path:
+            self._shared().execute("DELETE FROM predictions")
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses, "invalidations": self.invalidations,
+                    "size": len(self._entries),
+                    "hit_rate": round(self.hits / total, 4) if total else 0.0,
+                    "shared": bool(self.shared_path)}
+
+
+@lru_cache(maxsize=1)
+def get_prediction_cache():
+    """Process-wide cache shared by the API and the agent."""
+    return PredictionCache()